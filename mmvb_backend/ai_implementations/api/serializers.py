@@ -8,4 +8,11 @@ class AIImplementationSerializer(ModelSerializer):
 
     class Meta:
         model = AIImplementation
-        fields = ["id", "name", "base_url", "created_on", "modified_on"]
+        fields = [
+            "id",
+            "name",
+            "base_url",
+            "version",
+            "created_on",
+            "modified_on",
+        ]
@@ -35,6 +35,8 @@ class AIImplementationViewSet(ModelViewSet):
         else:
             response_status = status.HTTP_200_OK
             target_url = f"{ai_implementation.base_url}/health-check"
-            response_data = perform_request(target_url)
+            response_data = perform_request(
+                target_url, base_url=ai_implementation.base_url
+            )
 
         return Response(response_data, status=response_status)
@@ -0,0 +1,18 @@
+# Generated by Django 3.0.14 on 2026-10-18 09:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ai_implementations", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="aiimplementation",
+            name="version",
+            field=models.CharField(blank=True, default="", max_length=50),
+        ),
+    ]
@@ -9,6 +9,9 @@ class AIImplementation(BaseModel):
     # TODO: implement character validation for fields
     name = models.CharField(unique=True, max_length=50)
     base_url = models.URLField()
+    # tag of the deployed version, to be changed whenever the ai implementation
+    # changes, as its responses are only cached across sessions for a tag
+    version = models.CharField(max_length=50, blank=True, default="")
 
     def __str__(self):
         return self.name
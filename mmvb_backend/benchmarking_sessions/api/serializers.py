@@ -1,7 +1,15 @@
-from rest_framework.serializers import ModelSerializer
+from django.conf import settings
+from rest_framework.serializers import (
+    ModelSerializer,
+    SerializerMethodField,
+    ValidationError,
+)
 
 from benchmarking_sessions.models import BenchmarkingSession
 
+MAX_LOAD_LEVEL = settings.BENCHMARKING_SESSION_CAPACITY
+MAX_DEADLINE = settings.BENCHMARKING_SESSION_MAX_DEADLINE
+
 
 class BenchmarkingSessionSerializer(ModelSerializer):
     """Serializer for benchmark session data model"""
@@ -13,14 +21,124 @@ class BenchmarkingSessionSerializer(ModelSerializer):
             "case_set",
             "ai_implementations",
             "status",
+            "engine",
+            "shard_size",
+            "batch_size",
+            "max_retries",
+            "hedged_requests",
+            "use_cache",
+            "deadline",
+            "started_on",
+            "priority",
+            "kind",
+            "load_levels",
+            "load_step_duration",
+            "record_exchanges",
+            "replay_url",
+            "derived_from",
+            "early_stopping_metric",
+            "early_stopping_confidence",
             "created_on",
             "modified_on",
         ]
+        read_only_fields = ["started_on", "replay_url", "derived_from"]
+
+    def validate_deadline(self, deadline):
+        """Sessions must finish before the broker redelivers their task"""
+        if deadline is not None and deadline > MAX_DEADLINE:
+            raise ValidationError(
+                f"Invalid value {deadline}. It must be at most {MAX_DEADLINE}."
+            )
+        return deadline
+
+    def validate_load_levels(self, load_levels):
+        """Load levels are amounts of requests in flight, up to the capacity"""
+        if load_levels is None:
+            return load_levels
+
+        if not isinstance(load_levels, list) or not load_levels:
+            raise ValidationError(
+                "Invalid load levels. Expected a list of amounts of requests "
+                "in flight."
+            )
+        for load_level in load_levels:
+            if (
+                not isinstance(load_level, int)
+                or isinstance(load_level, bool)
+                or not 1 <= load_level <= MAX_LOAD_LEVEL
+            ):
+                raise ValidationError(
+                    f"Invalid value {load_level}. It must be within 1 and "
+                    f"{MAX_LOAD_LEVEL}."
+                )
+        return load_levels
+
+    def validate_early_stopping_confidence(self, confidence):
+        """Confidences are probabilities, excluding certainty"""
+        if confidence is not None and not 0 < confidence < 1:
+            raise ValidationError(
+                f"Invalid value {confidence}. It must be within 0 and 1."
+            )
+        return confidence
+
+    def validate(self, attrs):
+        """
+        Load tests run against a single ai implementation, while early
+        stopping needs several of them to rank
+        """
+        early_stopping_metric = attrs.get(
+            "early_stopping_metric",
+            self.instance.early_stopping_metric if self.instance else None,
+        )
+        if early_stopping_metric:
+            ai_implementations = attrs.get("ai_implementations")
+            if ai_implementations is None:
+                ai_implementations = (
+                    list(self.instance.ai_implementations.all())
+                    if self.instance
+                    else []
+                )
+            if len(ai_implementations) < 2:
+                raise ValidationError(
+                    {
+                        "early_stopping_metric": (
+                            "Early stopping ranks several ai "
+                            f"implementations. Got {len(ai_implementations)}"
+                        )
+                    }
+                )
+
+        kind = attrs.get(
+            "kind",
+            self.instance.kind
+            if self.instance
+            else BenchmarkingSession.Kind.BENCHMARK,
+        )
+        if kind == BenchmarkingSession.Kind.LOAD_TEST:
+            ai_implementations = attrs.get("ai_implementations")
+            if ai_implementations is None:
+                ai_implementations = (
+                    list(self.instance.ai_implementations.all())
+                    if self.instance
+                    else []
+                )
+            if len(ai_implementations) != 1:
+                raise ValidationError(
+                    {
+                        "ai_implementations": (
+                            "Load tests run against a single ai "
+                            f"implementation. Got {len(ai_implementations)}"
+                        )
+                    }
+                )
+        return attrs
 
 
 class BenchmarkingSessionResultsSerializer(ModelSerializer):
     """Serializer for benchmark session results"""
 
+    responses = SerializerMethodField()
+
     class Meta:
         model = BenchmarkingSession
         fields = [
@@ -28,5 +146,13 @@ class BenchmarkingSessionResultsSerializer(ModelSerializer):
             "case_set",
             "ai_implementations",
             "status",
+            "statistics",
+            "preflight",
+            "estimate",
+            "capacity_curve",
             "responses",
         ]
+
+    def get_responses(self, benchmarking_session):
+        """Returns the responses of the session grouped by case"""
+        return benchmarking_session.get_responses()
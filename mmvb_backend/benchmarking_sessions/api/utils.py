@@ -1,11 +1,4 @@
-def strip_values_from_responses(responses):
-    """Strips `value` property if present within ai response for a case"""
-    for case_responses in responses:
-        for ai_implementation_id, response in case_responses[
-            "responses"
-        ].items():
-            if "value" in response:
-                del response["value"]
+from benchmarking_sessions.performance import PERCENTILES, get_performance
 
 
 def get_stats_table(responses, ai_ids):
@@ -34,3 +27,114 @@ def get_stats_table(responses, ai_ids):
                 result[ai_id]["errors"] = result[ai_id]["errors"] + 1
 
     return result
+
+
+def merge_shard_statistics(shard_statistics, total_case_count, ai_ids):
+    """
+    Merges the progress counters of the shards of a benchmark session into
+    the statistics of the whole session
+
+    As shards run in parallel, the case indexes of the merged statistics
+    are the amount of cases finished by all (or each) ai implementations
+    """
+    table = {
+        ai_id: {"errors": 0, "timeouts": 0, "completed": 0} for ai_id in ai_ids
+    }
+    finished_case_count = 0
+
+    for statistics in shard_statistics:
+        finished_case_count += statistics["finishedCaseCount"]
+        for ai_id in ai_ids:
+            for counter, value in statistics["table"][ai_id].items():
+                table[ai_id][counter] += value
+
+    return {
+        "currentCaseIndex": finished_case_count,
+        "totalCaseCount": total_case_count,
+        "finishedCaseCount": finished_case_count,
+        "aiCaseIndexes": {
+            ai_id: sum(table[ai_id].values()) for ai_id in ai_ids
+        },
+        "table": table,
+        "performance": merge_shard_performance(shard_statistics, ai_ids),
+    }
+
+
+def merge_shard_performance(shard_statistics, ai_ids):
+    """
+    Merges the latency percentiles and throughput of the shards of a
+    benchmark session: throughputs add up, as shards run in parallel, while
+    percentiles are approximated by averaging those of the shards, weighted
+    by their amount of finished steps
+    """
+    performance = {}
+    for ai_id in ai_ids:
+        throughput = None
+        weighted_latencies = {
+            f"p{percentile}": 0 for percentile in PERCENTILES
+        }
+        weight = 0
+
+        for statistics in shard_statistics:
+            shard_performance = statistics["performance"][ai_id]
+            if shard_performance["throughput"] is not None:
+                throughput = (throughput or 0) + shard_performance[
+                    "throughput"
+                ]
+
+            if shard_performance["latency"]["p50"] is None:
+                continue
+            shard_weight = sum(statistics["table"][ai_id].values())
+            for percentile, value in shard_performance["latency"].items():
+                weighted_latencies[percentile] += value * shard_weight
+            weight += shard_weight
+
+        performance[ai_id] = {
+            "latency": {
+                percentile: value / weight if weight else None
+                for percentile, value in weighted_latencies.items()
+            },
+            "throughput": throughput,
+        }
+
+    return performance
+
+
+def get_performance_table(benchmarking_responses, ai_ids):
+    """
+    Returns the latency percentiles and throughput of each ai implementation
+    computed from the timings recorded on the steps of a benchmark session,
+    the throughput being the amount of requested steps per second between
+    the first step queued and the last completed
+    """
+    latencies = {ai_id: [] for ai_id in ai_ids}
+    step_counts = {ai_id: 0 for ai_id in ai_ids}
+    spans = {}
+
+    for ai_id, timings in benchmarking_responses.filter(
+        timings__isnull=False
+    ).values_list("ai_implementation_id", "timings"):
+        ai_id = str(ai_id)
+        if ai_id not in step_counts:
+            continue
+
+        step_counts[ai_id] += 1
+        if "sent" in timings and "firstByte" in timings:
+            latencies[ai_id].append(timings["completed"] - timings["sent"])
+
+        first_queued, last_completed = spans.get(
+            ai_id, (timings["queued"], timings["completed"])
+        )
+        spans[ai_id] = (
+            min(first_queued, timings["queued"]),
+            max(last_completed, timings["completed"]),
+        )
+
+    return {
+        ai_id: get_performance(
+            latencies[ai_id],
+            step_counts[ai_id],
+            spans[ai_id][1] - spans[ai_id][0] if ai_id in spans else 0,
+        )
+        for ai_id in ai_ids
+    }
@@ -1,4 +1,4 @@
-from celery.states import PENDING
+from celery.utils import uuid
 from django.shortcuts import get_object_or_404
 from rest_framework import status
 from rest_framework.decorators import action
@@ -10,11 +10,25 @@ from benchmarking_sessions.api.serializers import (
     BenchmarkingSessionSerializer,
 )
 from benchmarking_sessions.api.utils import (
+    get_performance_table,
     get_stats_table,
-    strip_values_from_responses,
+    merge_shard_statistics,
 )
-from benchmarking_sessions.models import BenchmarkingSession
-from benchmarking_sessions.tasks import run_benchmark
+from benchmarking_sessions.estimates import estimate_runtime, get_eta
+from benchmarking_sessions.load_test import (
+    get_load_test_progress,
+    get_peak_step,
+)
+from benchmarking_sessions.models import (
+    BenchmarkingSession,
+    BenchmarkingStepStatus,
+)
+from benchmarking_sessions.progress import (
+    get_deltas,
+    get_progress,
+    request_cancellation,
+)
+from benchmarking_sessions.tasks import has_live_task, run_benchmark
 from common.utils import CamelCaseAutoSchema
 from metrics.helpers import calculate_metrics
 
@@ -37,10 +51,49 @@ class BenchmarkingSessionViewSet(ModelViewSet):
             BenchmarkingSession, id=kwargs["pk"]
         )
 
-        # pushes benchmarking task into celery queue
-        task = run_benchmark.delay(benchmarking_session.id)
-        benchmarking_session.task_id = task.id
-        benchmarking_session.save(update_fields=["task_id"])
+        # the session is marked as queued (unless it is queued or running
+        # already) before its task is sent, so that a worker starting it
+        # right away never has its status overwritten
+        sessions = BenchmarkingSession.objects.filter(
+            id=benchmarking_session.id
+        )
+        if benchmarking_session.status == (
+            BenchmarkingSession.Status.RUNNING
+        ) and not has_live_task(benchmarking_session):
+            # sessions left running by a lost worker are resumed right away
+            # instead of once the broker redelivers their task, then skipped
+            sessions = sessions.filter(
+                status=BenchmarkingSession.Status.RUNNING,
+                task_id=benchmarking_session.task_id,
+            )
+        else:
+            sessions = sessions.exclude(
+                status=BenchmarkingSession.Status.RUNNING
+            ).exclude(
+                status=BenchmarkingSession.Status.CREATED,
+                task_id__isnull=False,
+            )
+        task_id = uuid()
+        queued_count = sessions.update(
+            status=BenchmarkingSession.Status.CREATED, task_id=task_id
+        )
+        if not queued_count:
+            return Response(
+                {
+                    "detail": (
+                        "The benchmark session is already queued or running"
+                    )
+                },
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        # pushes benchmarking task into the celery queue of its priority,
+        # the session being queued again if it ran before (e.g. cancelled)
+        run_benchmark.apply_async(
+            (benchmarking_session.id,),
+            queue=benchmarking_session.queue,
+            task_id=task_id,
+        )
         return Response(
             {
                 "statusUrl": f"/benchmarking-sessions/{benchmarking_session.id}/status"
@@ -48,24 +101,216 @@ class BenchmarkingSessionViewSet(ModelViewSet):
             status=status.HTTP_202_ACCEPTED,
         )
 
+    @action(methods=["post"], detail=True, url_path="cancel")
+    def cancel_benchmark(self, request, *args, **kwargs):
+        """
+        Handler for cancelling benchmark sessions, which stop sending cases
+        promptly, keeping the responses received so far
+        """
+        benchmarking_session = get_object_or_404(
+            BenchmarkingSession, id=kwargs["pk"]
+        )
+
+        # the status is updated first, and only from queued or running as
+        # the session may be starting meanwhile: a session not yet marked
+        # running then never runs, while a running one sees the flag below
+        cancellable_status = [BenchmarkingSession.Status.RUNNING]
+        if benchmarking_session.task_id:
+            cancellable_status.append(BenchmarkingSession.Status.CREATED)
+        cancelled_count = BenchmarkingSession.objects.filter(
+            id=benchmarking_session.id, status__in=cancellable_status
+        ).update(status=BenchmarkingSession.Status.CANCELLED)
+        if not cancelled_count:
+            benchmarking_session.refresh_from_db(fields=["status"])
+            return Response(
+                {
+                    "detail": (
+                        "Only queued or running benchmark sessions can be "
+                        f"cancelled. Got {benchmarking_session.status}"
+                    )
+                },
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        if benchmarking_session.status == BenchmarkingSession.Status.CREATED:
+            # the session is still queued, so it never starts
+            run_benchmark.AsyncResult(benchmarking_session.task_id).revoke()
+        # the executions of the session stop at their next check
+        request_cancellation(benchmarking_session.id)
+
+        return Response(
+            {"status": BenchmarkingSession.Status.CANCELLED},
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+    @action(methods=["post"], detail=True, url_path="derive")
+    def derive_benchmark(self, request, *args, **kwargs):
+        """
+        Handler for deriving a benchmark session from a finished one, e.g.
+        with new ai implementations or once its case set gained new cases,
+        which only requests the pairs of case and ai implementation the
+        finished session did not complete when run
+
+        The derived session takes the settings of the finished one, but for
+        those given in the request
+        """
+        derived_from = get_object_or_404(BenchmarkingSession, id=kwargs["pk"])
+
+        if (
+            derived_from.status != BenchmarkingSession.Status.FINISHED
+            or derived_from.kind != BenchmarkingSession.Kind.BENCHMARK
+        ):
+            return Response(
+                {
+                    "detail": (
+                        "Only finished benchmarks can be derived from. Got "
+                        f"{derived_from.kind} <{derived_from.status}>"
+                    )
+                },
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        data = {
+            "case_set": derived_from.case_set_id,
+            "ai_implementations": list(
+                derived_from.ai_implementations.values_list("id", flat=True)
+            ),
+            "engine": derived_from.engine,
+            "shard_size": derived_from.shard_size,
+            "batch_size": derived_from.batch_size,
+            "max_retries": derived_from.max_retries,
+            "hedged_requests": derived_from.hedged_requests,
+            "use_cache": derived_from.use_cache,
+            "deadline": derived_from.deadline,
+            "priority": derived_from.priority,
+            "early_stopping_metric": derived_from.early_stopping_metric,
+            "early_stopping_confidence": (
+                derived_from.early_stopping_confidence
+            ),
+            **request.data,
+        }
+        serializer = self.get_serializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save(derived_from=derived_from)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(methods=["get"], detail=True, url_path="estimate")
+    def benchmark_estimate(self, request, *args, **kwargs):
+        """
+        Handler for estimating the runtime and amount of requests of running
+        a benchmark session, from the rolling statistics of its ais
+        """
+        benchmarking_session = get_object_or_404(
+            BenchmarkingSession, id=kwargs["pk"]
+        )
+
+        return Response(
+            estimate_runtime(benchmarking_session), status=status.HTTP_200_OK,
+        )
+
+    @action(methods=["get"], detail=True, url_path="capacity-curve")
+    def benchmark_capacity_curve(self, request, *args, **kwargs):
+        """
+        Handler for fetching the capacity curve measured by a load test
+        session, i.e. the throughput, error rate and latency percentiles of
+        its ai implementation at each concurrency level (so far, while
+        running), along with the step of highest throughput
+        """
+        benchmarking_session = get_object_or_404(
+            BenchmarkingSession, id=kwargs["pk"]
+        )
+
+        if benchmarking_session.kind != BenchmarkingSession.Kind.LOAD_TEST:
+            return Response(
+                {
+                    "detail": (
+                        "Only load test sessions have a capacity curve. "
+                        f"Got {benchmarking_session.kind}"
+                    )
+                },
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        capacity_curve = benchmarking_session.capacity_curve or []
+        return Response(
+            {
+                "status": benchmarking_session.status,
+                "steps": capacity_curve,
+                "peak": get_peak_step(capacity_curve),
+            },
+            status=status.HTTP_200_OK,
+        )
+
     # todo: document response structure (OpenAPI)
     @action(methods=["get"], detail=True, url_path="status")
     def benchmark_status(self, request, *args, **kwargs):
-        """Handler for checking benchmark session status"""
+        """
+        Handler for checking benchmark session status
+
+        Running sessions come with the step status changes from the `cursor`
+        query parameter on (the first one by default), along with the cursor
+        to follow them up from, so that clients can keep the state of every
+        step up to date without fetching the results
+        """
 
         benchmarking_session = get_object_or_404(
             BenchmarkingSession, id=kwargs["pk"]
         )
 
+        try:
+            cursor = int(request.query_params.get("cursor", 0))
+            if cursor < 0:
+                raise ValueError
+        except ValueError:
+            return Response(
+                {
+                    "detail": (
+                        "Invalid cursor. Expected a non-negative integer. "
+                        f"Got {request.query_params['cursor']}"
+                    )
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
         if benchmarking_session.status != BenchmarkingSession.Status.RUNNING:
             return Response(
                 {"status": benchmarking_session.status},
                 status=status.HTTP_200_OK,
             )
 
-        result = run_benchmark.AsyncResult(benchmarking_session.task_id)
+        # load tests go through concurrency levels rather than cases
+        if benchmarking_session.kind == BenchmarkingSession.Kind.LOAD_TEST:
+            statistics, eta = get_load_test_progress(benchmarking_session)
+            return Response(
+                {
+                    "status": benchmarking_session.status,
+                    "statistics": statistics,
+                    "eta": eta,
+                },
+                status=status.HTTP_200_OK,
+            )
 
-        if result.status == PENDING or result.info is None:
+        ais = benchmarking_session.ai_implementations.all()
+        ai_ids = [str(ai.id) for ai in ais]
+
+        # progress is read from the compact counters kept in redis by the
+        # running executions, never from the celery task meta
+        total_case_count, shard_statistics = get_progress(
+            benchmarking_session.id, ai_ids
+        )
+        if not shard_statistics:
+            statistics = None
+        elif (
+            len(shard_statistics) == 1
+            and shard_statistics[0]["totalCaseCount"] == total_case_count
+        ):
+            statistics = shard_statistics[0]
+        else:
+            statistics = merge_shard_statistics(
+                shard_statistics, total_case_count, ai_ids
+            )
+
+        if statistics is None:
             # this is an in-between state where the celery task status is not yet reflected in the main DB,
             # so either the task is about to begin or just finished -- in either case it's easiest to pretend it is
             # running
@@ -74,16 +319,24 @@ class BenchmarkingSessionViewSet(ModelViewSet):
                 status=status.HTTP_200_OK,
             )
 
-        strip_values_from_responses(result.info["responses"])
+        # progress is published as compact counters, so statistics look like
+        # {'currentCaseIndex': 30, 'totalCaseCount': 50, 'finishedCaseCount': 30,
+        #  'aiCaseIndexes': {<ai_id>: 42, ...}, 'table': {<ai_id>: {'errors': 0, ...}, ...},
+        #  'performance': {<ai_id>: {'latency': {'p50': 0.1, ...}, 'throughput': 80.2}, ...}}
 
-        ais = benchmarking_session.ai_implementations.all()
-        ai_ids = [str(ai.id) for ai in ais]
-        statistics = result.info["statistics"]
-        # at this point statistics looks like this {'currentCaseIndex': 30, 'totalCaseCount': 50}
-        statistics["table"] = get_stats_table(result.info["responses"], ai_ids)
+        # seconds left, refined as the session progresses
+        eta = get_eta(statistics, benchmarking_session.estimate)
+
+        deltas, next_cursor = get_deltas(benchmarking_session.id, cursor)
 
         return Response(
-            {"status": benchmarking_session.status, "statistics": statistics,},
+            {
+                "status": benchmarking_session.status,
+                "statistics": statistics,
+                "eta": eta,
+                "deltas": deltas,
+                "cursor": next_cursor,
+            },
             status=status.HTTP_200_OK,
         )
 
@@ -99,6 +352,22 @@ class BenchmarkingSessionViewSet(ModelViewSet):
             benchmarking_session
         ).data
 
+        # sessions stopped once their ranking was settled are evaluated on
+        # the cases solved by all of their ai implementations
+        if benchmarking_session.status == BenchmarkingSession.Status.SETTLED:
+            finished_status = {
+                BenchmarkingStepStatus.COMPLETED.value,
+                BenchmarkingStepStatus.ERRORED.value,
+            }
+            benchmarking_session_result["responses"] = [
+                case_responses
+                for case_responses in benchmarking_session_result["responses"]
+                if all(
+                    response["status"] in finished_status
+                    for response in case_responses["responses"].values()
+                )
+            ]
+
         # calculates and aggregates metrics for benchmark results
         benchmarking_session_result["metrics"] = calculate_metrics(
             benchmarking_session_result
@@ -110,6 +379,12 @@ class BenchmarkingSessionViewSet(ModelViewSet):
         stats_table = get_stats_table(
             benchmarking_session_result["responses"], ai_ids
         )
+        # latency percentiles and throughput next to the counters
+        performance_table = get_performance_table(
+            benchmarking_session.benchmarking_responses.all(), ai_ids
+        )
+        for ai_id, performance in performance_table.items():
+            stats_table[ai_id].update(performance)
         benchmarking_session_result["statsTable"] = stats_table
         del benchmarking_session_result["responses"]
 
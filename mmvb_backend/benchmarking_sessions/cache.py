@@ -0,0 +1,136 @@
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from benchmarking_sessions.models import BenchmarkingStepStatus, CachedResponse
+
+CACHE_TTL = settings.BENCHMARKING_SESSION_CACHE_TTL
+CACHE_MAX_ENTRIES = settings.BENCHMARKING_SESSION_CACHE_MAX_ENTRIES
+CHECKPOINT_BATCH_SIZE = settings.BENCHMARKING_SESSION_CHECKPOINT_BATCH_SIZE
+
+
+def hash_case_data(raw_case_data):
+    """
+    Returns the sha256 of the raw json text of some case data, as stored by
+    the database, which normalises it
+    """
+    return hashlib.sha256(raw_case_data.encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    Cache of the responses of ai implementations across benchmark sessions,
+    keyed by ai implementation, version tag and hash of the case data
+
+    Ai implementations without a version tag are neither served from nor
+    stored in the cache, as there is no telling whether they changed
+    """
+
+    def __init__(self, ai_implementations, cases):
+        self.versions = {
+            str(ai_implementation.id): ai_implementation.version
+            for ai_implementation in ai_implementations
+            if ai_implementation.version
+        }
+        self.case_data_hashes = {
+            str(case.id): hash_case_data(case.raw_case_data) for case in cases
+        }
+
+    def lookup(self, ai_implementation_id, case_ids):
+        """
+        Returns the cached responses of an ai implementation for the given
+        cases, by case id
+        """
+        ai_implementation_id = str(ai_implementation_id)
+        version = self.versions.get(ai_implementation_id)
+        if version is None:
+            return {}
+
+        case_ids_by_hash = {}
+        for case_id in case_ids:
+            case_ids_by_hash.setdefault(
+                self.case_data_hashes[str(case_id)], []
+            ).append(str(case_id))
+        case_data_hashes = list(case_ids_by_hash)
+
+        cached_responses = {}
+        expiry = timezone.now() - timedelta(seconds=CACHE_TTL)
+        for first in range(0, len(case_data_hashes), CHECKPOINT_BATCH_SIZE):
+            for case_data_hash, value in CachedResponse.objects.filter(
+                ai_implementation_id=ai_implementation_id,
+                version=version,
+                case_data_hash__in=case_data_hashes[
+                    first : first + CHECKPOINT_BATCH_SIZE
+                ],
+                created_on__gte=expiry,
+            ).values_list("case_data_hash", "value"):
+                for case_id in case_ids_by_hash[case_data_hash]:
+                    cached_responses[case_id] = value
+
+        return cached_responses
+
+    def store(self, steps):
+        """
+        Caches the responses of the given finished steps that were answered
+        by a versioned ai implementation, replacing the expired ones
+        """
+        cached_responses = [
+            CachedResponse(
+                ai_implementation_id=step["aiImplementationId"],
+                version=self.versions[step["aiImplementationId"]],
+                case_data_hash=self.case_data_hashes[step["caseId"]],
+                value=step["value"],
+            )
+            for step in steps
+            if step["status"] == BenchmarkingStepStatus.COMPLETED.value
+            and not step.get("cached")
+            and step["aiImplementationId"] in self.versions
+        ]
+
+        # expired responses would otherwise keep the fresh ones out until
+        # they are evicted
+        case_data_hashes = {}
+        for cached_response in cached_responses:
+            case_data_hashes.setdefault(
+                cached_response.ai_implementation_id, []
+            ).append(cached_response.case_data_hash)
+        expiry = timezone.now() - timedelta(seconds=CACHE_TTL)
+        for ai_implementation_id, hashes in case_data_hashes.items():
+            for first in range(0, len(hashes), CHECKPOINT_BATCH_SIZE):
+                CachedResponse.objects.filter(
+                    ai_implementation_id=ai_implementation_id,
+                    version=self.versions[ai_implementation_id],
+                    case_data_hash__in=hashes[
+                        first : first + CHECKPOINT_BATCH_SIZE
+                    ],
+                    created_on__lt=expiry,
+                ).delete()
+
+        CachedResponse.objects.bulk_create(
+            cached_responses,
+            batch_size=CHECKPOINT_BATCH_SIZE,
+            # responses cached by concurrent sessions are kept as they are
+            ignore_conflicts=True,
+        )
+
+
+def evict_cached_responses():
+    """
+    Deletes the expired cached responses, along with the oldest ones beyond
+    the maximum amount of cached responses
+    """
+    CachedResponse.objects.filter(
+        created_on__lt=timezone.now() - timedelta(seconds=CACHE_TTL)
+    ).delete()
+
+    overflowing_created_on = CachedResponse.objects.order_by(
+        "-created_on"
+    ).values_list("created_on", flat=True)[
+        CACHE_MAX_ENTRIES : CACHE_MAX_ENTRIES + 1
+    ]
+    for newest_evicted_created_on in overflowing_created_on:
+        CachedResponse.objects.filter(
+            created_on__lte=newest_evicted_created_on
+        ).delete()
@@ -0,0 +1,178 @@
+import json
+import math
+
+from django.conf import settings
+from django.db import models
+from django.db.models import F, Func, Value
+
+from benchmarking_sessions.models import (
+    BenchmarkingSession,
+    BenchmarkingStepStatus,
+)
+
+EARLY_STOPPING_CONFIDENCE = (
+    settings.BENCHMARKING_SESSION_EARLY_STOPPING_CONFIDENCE
+)
+
+RankingMetric = BenchmarkingSession.RankingMetric
+
+# amount of top conditions looked for the correct one in, by metric
+TOP_N = {
+    RankingMetric.CORRECT_CONDITIONS_TOP_1: 1,
+    RankingMetric.CORRECT_CONDITIONS_TOP_3: 3,
+    RankingMetric.CORRECT_CONDITIONS_TOP_10: 10,
+}
+
+
+def score_response(metric, values_to_predict, response):
+    """
+    Returns the value of a ranking metric for the response of an ai
+    implementation to a case, i.e. 1 if it matches the values to predict of
+    the case and 0 otherwise (errors included), as the metrics do
+    """
+    if response["status"] != BenchmarkingStepStatus.COMPLETED.value:
+        return 0
+
+    value = response.get("value", {})
+    if metric == RankingMetric.TRIAGE_MATCH:
+        return int(
+            value.get("triage") == values_to_predict["expectedTriageLevel"]
+        )
+
+    correct_condition_id = values_to_predict["correctCondition"]["id"]
+    return int(
+        correct_condition_id
+        in [
+            condition["id"]
+            for condition in value.get("conditions", [])[: TOP_N[metric]]
+        ]
+    )
+
+
+class RankingMonitor:
+    """
+    Keeps running estimates of a metric for each ai implementation of a
+    benchmark session as its steps finish, along with confidence bounds
+    holding for all ai implementations at once and at any time, so that the
+    session may stop as soon as they tell the ranking apart
+
+    Bounds are Hoeffding's, with the error split between the ai
+    implementations and between every amount of steps the bounds are looked
+    at (`error / (n * (n + 1))` for the n-th), which keeps them valid however
+    often they are checked, at the price of being conservative
+    """
+
+    def __init__(self, metric, confidence, values_to_predict, ai_ids):
+        self.metric = metric
+        self.confidence = confidence
+        # values to predict of each case, by case id
+        self.values_to_predict = values_to_predict
+        self.sums = {ai_id: 0 for ai_id in ai_ids}
+        self.counts = {ai_id: 0 for ai_id in ai_ids}
+
+    @classmethod
+    def for_session(cls, benchmarking_session):
+        """Returns the ranking monitor of a benchmark session"""
+        raw_values_to_predict = (
+            benchmarking_session.get_cases()
+            .annotate(
+                raw_values_to_predict=Func(
+                    F("data"),
+                    Value("$.valuesToPredict"),
+                    function="JSON_EXTRACT",
+                    output_field=models.TextField(),
+                )
+            )
+            .values_list("id", "raw_values_to_predict")
+        )
+        return cls(
+            benchmarking_session.early_stopping_metric,
+            benchmarking_session.early_stopping_confidence
+            or EARLY_STOPPING_CONFIDENCE,
+            {
+                str(case_id): json.loads(values_to_predict)
+                for case_id, values_to_predict in raw_values_to_predict
+            },
+            [
+                str(ai_implementation_id)
+                for ai_implementation_id in (
+                    benchmarking_session.ai_implementations.values_list(
+                        "id", flat=True
+                    )
+                )
+            ],
+        )
+
+    def record(self, case_id, ai_implementation_id, response):
+        """Takes a finished step into account"""
+        ai_implementation_id = str(ai_implementation_id)
+        self.sums[ai_implementation_id] += score_response(
+            self.metric, self.values_to_predict[case_id], response
+        )
+        self.counts[ai_implementation_id] += 1
+
+    def interval(self, ai_implementation_id):
+        """
+        Returns the estimate of the metric for an ai implementation along
+        with its confidence bounds, which are none until it finished a step
+        """
+        count = self.counts[ai_implementation_id]
+        if not count:
+            return {"count": 0, "mean": None, "lower": None, "upper": None}
+
+        mean = self.sums[ai_implementation_id] / count
+        error = (1 - self.confidence) / len(self.counts)
+        radius = math.sqrt(
+            math.log(2 * count * (count + 1) / error) / (2 * count)
+        )
+        return {
+            "count": count,
+            "mean": mean,
+            "lower": max(mean - radius, 0),
+            "upper": min(mean + radius, 1),
+        }
+
+    def is_settled(self):
+        """
+        Informs whether the ranking of the ai implementations is settled,
+        i.e. the confidence intervals of any two of them are disjoint
+        """
+        if len(self.counts) < 2:
+            return False
+
+        intervals = [
+            self.interval(ai_implementation_id)
+            for ai_implementation_id in self.counts
+        ]
+        if any(interval["mean"] is None for interval in intervals):
+            return False
+
+        intervals.sort(key=lambda interval: interval["mean"], reverse=True)
+        return all(
+            better["lower"] > worse["upper"]
+            for better, worse in zip(intervals, intervals[1:])
+        )
+
+    def statistics(self):
+        """
+        Returns the estimates to be recorded on the benchmark session, e.g.
+        `{"metric": "triage_match", "confidence": 0.95, "settled": true,
+          "ranking": [<ai id>, ...], "intervals": {<ai id>: {...}, ...}}`
+        """
+        intervals = {
+            ai_implementation_id: self.interval(ai_implementation_id)
+            for ai_implementation_id in self.counts
+        }
+        return {
+            "metric": self.metric,
+            "confidence": self.confidence,
+            "settled": self.is_settled(),
+            "ranking": sorted(
+                intervals,
+                key=lambda ai_implementation_id: (
+                    intervals[ai_implementation_id]["mean"] or 0
+                ),
+                reverse=True,
+            ),
+            "intervals": intervals,
+        }
@@ -0,0 +1,9 @@
+from common.utils import get_all_subclasses, import_modules
+
+from .base import Engine
+
+# imports submodules to populate Engine subclasses list
+import_modules(__name__)
+ENGINES = get_all_subclasses(Engine)
+
+SUPPORTED_ENGINES = {engine.name: engine for engine in ENGINES}
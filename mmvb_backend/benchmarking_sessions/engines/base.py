@@ -0,0 +1,769 @@
+import gzip
+import json
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from posixpath import join as urljoin
+
+from django.conf import settings
+from django.utils.decorators import classproperty
+
+from benchmarking_sessions.models import (
+    BenchmarkingSession,
+    BenchmarkingStepError,
+)
+from benchmarking_sessions.performance import get_latency_percentiles
+from benchmarking_sessions.validation import get_response_validator
+
+from .utils import (
+    AIMDController,
+    CircuitBreaker,
+    FixedWindowController,
+    RequestTrace,
+    RetryPolicy,
+)
+
+
+class AILane:
+    """
+    Keeps track of the cases dispatched to a single ai implementation,
+    allowing at most as many requests in flight as the window of its
+    concurrency controller
+
+    Ai implementations supporting the solve-cases endpoint get `batch_size`
+    cases per request, the others a single case through solve-case
+    """
+
+    # amount of latest latencies the hedge delay is computed from, and the
+    # minimum amount needed before hedging at all
+    HEDGE_SAMPLE_SIZE = 200
+    HEDGE_MIN_SAMPLE_SIZE = 20
+
+    def __init__(
+        self,
+        ai_implementation,
+        case_indexes,
+        controller,
+        breaker,
+        batch_size=None,
+        gzip_requests=False,
+        base_url=None,
+    ):
+        self.ai_implementation = ai_implementation
+        # base url the ai implementation is requested through, e.g. that of
+        # a replay server instead of its own
+        self.base_url = base_url or ai_implementation.base_url
+        self.encoded_name = json.dumps(ai_implementation.name).encode()
+        self.case_indexes = deque(case_indexes)
+        self.controller = controller
+        self.breaker = breaker
+        self.batch_size = batch_size
+        self.gzip_requests = gzip_requests
+        self.in_flight = 0
+        # monotonic time up to which cases were failed fast at the pace of
+        # the lane, while no other lane was there to follow
+        self.failed_fast_until = None
+
+        # latest latencies, for hedging requests slower than usual
+        self.latencies = deque(maxlen=self.HEDGE_SAMPLE_SIZE)
+        # latest latencies of the requests that failed, for failing fast at
+        # the pace of an ai implementation that was never healthy
+        self.failure_latencies = deque(maxlen=self.HEDGE_SAMPLE_SIZE)
+        self.retries = 0
+        self.hedges = 0
+        self.request_bytes_saved = 0
+        self.response_bytes_saved = 0
+
+    @property
+    def batched(self):
+        """Informs whether cases are sent in batches"""
+        return self.batch_size is not None
+
+    @property
+    def endpoint(self):
+        """Returns the url of the ai implementation that solves the cases"""
+        operation = "solve-cases" if self.batched else "solve-case"
+        return urljoin(self.base_url, operation)
+
+    def can_dispatch(self):
+        """Informs whether another request can be sent to the ai"""
+        return (
+            bool(self.case_indexes)
+            and self.in_flight < self.controller.window_size
+            and self.breaker.allow_request()
+        )
+
+    @property
+    def finished(self):
+        """Informs whether all cases of the lane are done"""
+        return not self.case_indexes and not self.in_flight
+
+    def dispatch(self):
+        """
+        Reserves a slot in the window and returns the indexes of the cases
+        to send
+        """
+        self.in_flight += 1
+        return [
+            self.case_indexes.popleft()
+            for _ in range(min(self.batch_size or 1, len(self.case_indexes)))
+        ]
+
+    def release(self):
+        """Frees the window slot of a finished request"""
+        self.in_flight -= 1
+
+    def record_latency(self, latency):
+        """Records the latency of a request answered by the ai"""
+        self.latencies.append(latency)
+
+    def record_failure_latency(self, latency):
+        """Records the latency of a request the ai failed, if it was sent"""
+        if latency is not None:
+            self.failure_latencies.append(latency)
+
+    @property
+    def hedge_delay(self):
+        """
+        Seconds after which a request is sent a second time, i.e. the p95
+        latency of the ai implementation, once enough latencies are known
+        """
+        if len(self.latencies) < self.HEDGE_MIN_SAMPLE_SIZE:
+            return None
+        return get_latency_percentiles(self.latencies)["p95"]
+
+
+class PendingRequest:
+    """
+    Request for some cases of a lane, which is sent again after a backoff
+    when it fails transiently (retry) or alongside the first attempt when
+    it takes longer than usual (hedge), until one of its attempts is done
+    """
+
+    def __init__(self, lane, case_indexes, body, headers):
+        self.lane = lane
+        self.case_indexes = case_indexes
+        self.body = body
+        self.headers = headers
+        self.queued = time.time()
+        self.retries = 0
+        self.hedges = 0
+        # attempts in flight, and monotonic time the latest one was sent
+        self.in_flight = 0
+        self.sent_at = None
+        self.finished = False
+
+    def attempt(self):
+        """Returns the trace of a new attempt, counted as being in flight"""
+        self.in_flight += 1
+        self.sent_at = time.monotonic()
+        trace = RequestTrace(len(self.body), queued=self.queued)
+        trace.mark_sent()
+        return trace
+
+
+class Engine(ABC):
+    """
+    Abstract base class for defining an interface for implementing engines
+    that send the cases of a benchmarking session to its ai implementations
+
+    Every ai implementation works through the case set on its own lane,
+    keeping a bounded window of requests in flight, so that slow ai
+    implementations do not hold back the faster ones. The window of each
+    lane adapts to the load its ai implementation is able to take
+
+    Engines stop early once the wall-clock `deadline` (a unix timestamp) is
+    reached, or `is_cancelled` or `is_settled` (polled every poll interval)
+    returns true, abandoning the requests in flight and leaving the cases
+    not yet solved pending; `stopped` then holds the resulting session status
+
+    The windows are further bounded by `window_share` (polled as well), the
+    share of the capacity left to the execution by the other sessions
+
+    Ai implementations are requested through `base_urls` (keyed by id) when
+    given instead of their own, and every attempt is handed to `recorder`
+
+    Load tests rather set a fixed `concurrency`, keeping that amount of
+    requests in flight to each ai implementation whatever its responses,
+    without circuit breaker
+    """
+
+    timeout = settings.BENCHMARKING_SESSION_TIMEOUT
+    initial_window_size = settings.BENCHMARKING_SESSION_INITIAL_WINDOW_SIZE
+    breaker_threshold = settings.BENCHMARKING_SESSION_BREAKER_THRESHOLD
+    breaker_reset_timeout = settings.BENCHMARKING_SESSION_BREAKER_RESET_TIMEOUT
+    # seconds between two checks of lanes waiting on their circuit breaker
+    poll_interval = 1
+    request_headers = {
+        "Content-Type": "application/json",
+        "Accept-Encoding": "gzip",
+    }
+    # request bodies smaller than this amount of bytes are not worth gzipping
+    gzip_min_size = 1024
+    gzip_level = 6
+    retry_backoff = settings.BENCHMARKING_SESSION_RETRY_BACKOFF
+    retry_max_backoff = settings.BENCHMARKING_SESSION_RETRY_MAX_BACKOFF
+
+    def __init__(
+        self,
+        cases,
+        ai_implementations,
+        reporter,
+        batch_sizes=None,
+        gzip_requests=None,
+        max_retries=0,
+        hedging=False,
+        deadline=None,
+        is_cancelled=None,
+        window_share=None,
+        concurrency=None,
+        base_urls=None,
+        recorder=None,
+        is_settled=None,
+    ):
+        self.cases = cases
+        self.ai_implementations = ai_implementations
+        self.reporter = reporter
+        # json fragments of each case, encoded once for all ai implementations
+        # (the case data being passed through from the database as is)
+        self.encoded_case_ids = [
+            json.dumps(str(case.id)).encode() for case in cases
+        ]
+        self.encoded_case_data = [
+            case.raw_case_data.encode() for case in cases
+        ]
+        self.retry_policy = RetryPolicy(
+            max_retries, self.retry_backoff, self.retry_max_backoff
+        )
+        self.hedging = hedging
+        # compiled once per worker process
+        self.validate_response = get_response_validator()
+        self.deadline = deadline
+        self.is_cancelled = is_cancelled
+        self.is_settled = is_settled
+        self.window_share = window_share
+        self.stopped = None
+        self.last_poll_time = None
+        self.recorder = recorder
+
+        # batch size for each ai implementation supporting solve-cases, and
+        # ids of those accepting gzipped request bodies
+        batch_sizes = batch_sizes or {}
+        gzip_requests = gzip_requests or set()
+        base_urls = base_urls or {}
+        self.lanes = [
+            AILane(
+                ai_implementation,
+                reporter.pending_case_indexes(ai_implementation.id),
+                self.new_controller(concurrency),
+                CircuitBreaker(
+                    self.breaker_threshold
+                    if concurrency is None
+                    else math.inf,
+                    self.breaker_reset_timeout,
+                ),
+                batch_sizes.get(str(ai_implementation.id)),
+                str(ai_implementation.id) in gzip_requests,
+                base_urls.get(str(ai_implementation.id)),
+            )
+            for ai_implementation in ai_implementations
+        ]
+
+    def drain(self):
+        """
+        Waits for the requests abandoned when stopping early to end, for
+        engines unable to interrupt them
+        """
+
+    def new_controller(self, concurrency=None):
+        """
+        Returns the controller of the window of a lane, which adapts to the
+        load the ai implementation is able to take unless the concurrency is
+        fixed
+        """
+        if concurrency is not None:
+            return FixedWindowController(concurrency)
+        return AIMDController(self.initial_window_size, self.window_size)
+
+    @classproperty
+    @abstractmethod
+    def name(cls) -> str:
+        """Abstract class property for returning the name of the Engine"""
+        raise NotImplementedError
+
+    @classproperty
+    @abstractmethod
+    def window_size(cls) -> int:
+        """
+        Abstract class property for returning the upper bound of the amount
+        of requests in flight for each ai implementation
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def run(self):
+        """
+        Abstract method for sending all cases to all ai implementations and
+        reporting their responses
+        """
+        raise NotImplementedError
+
+    def statistics(self):
+        """
+        Returns the statistics of the execution to be recorded on the
+        benchmark session
+        """
+        return {
+            "concurrency": {
+                str(lane.ai_implementation.id): {
+                    "settled": lane.controller.window_size,
+                    "peak": lane.controller.peak_window_size,
+                }
+                for lane in self.lanes
+            },
+            "circuitBreaker": {
+                str(lane.ai_implementation.id): {
+                    "openings": lane.breaker.openings
+                }
+                for lane in self.lanes
+            },
+            "requests": {
+                str(lane.ai_implementation.id): {
+                    "retries": lane.retries,
+                    "hedges": lane.hedges,
+                }
+                for lane in self.lanes
+            },
+            "compression": {
+                str(lane.ai_implementation.id): {
+                    "requestBytesSaved": lane.request_bytes_saved,
+                    "responseBytesSaved": lane.response_bytes_saved,
+                }
+                for lane in self.lanes
+            },
+        }
+
+    @property
+    def finished(self):
+        """
+        Informs whether all cases of all lanes are done, or whether the
+        execution is to stop before
+        """
+        return self.check_stopped() or all(
+            lane.finished for lane in self.lanes
+        )
+
+    def check_stopped(self):
+        """
+        Informs whether the execution is to stop, as its deadline passed, it
+        was cancelled or its ranking settled, keeping the reason as the
+        resulting session status
+        """
+        if self.stopped is not None:
+            return True
+
+        if self.deadline is not None and time.time() >= self.deadline:
+            self.stopped = BenchmarkingSession.Status.TIMED_OUT
+        elif (
+            self.last_poll_time is None
+            or time.monotonic() - self.last_poll_time >= self.poll_interval
+        ):
+            self.last_poll_time = time.monotonic()
+            self.poll()
+
+        return self.stopped is not None
+
+    def poll(self):
+        """
+        Checks whether the execution was cancelled or its ranking settled,
+        and bounds the windows of the lanes by the current share of the
+        capacity
+        """
+        if self.is_cancelled is not None and self.is_cancelled():
+            self.stopped = BenchmarkingSession.Status.CANCELLED
+        elif self.is_settled is not None and self.is_settled():
+            self.stopped = BenchmarkingSession.Status.SETTLED
+
+        if self.window_share is not None:
+            maximum_window_size = min(self.window_size, self.window_share())
+            for lane in self.lanes:
+                lane.controller.resize(maximum_window_size)
+
+    def fail_fast(self, lane):
+        """
+        Fails the cases of a lane whose circuit breaker is open, without
+        requesting its ai implementation
+
+        Cases are failed no further than the other lanes went, so that the
+        breaker still gets the chance to probe the ai implementation while
+        the session goes on. Without any other lane to follow (e.g. a single
+        ai implementation), they are failed at the pace the lane would go,
+        until the reset timeout lets the probe through
+        """
+        if not lane.breaker.is_open:
+            return
+
+        other_positions = [
+            other_lane.case_indexes[0]
+            if other_lane.case_indexes
+            else len(self.cases)
+            for other_lane in self.lanes
+            if other_lane is not lane and not other_lane.breaker.is_open
+        ]
+        if other_positions:
+            failed_count = len(lane.case_indexes)
+            frontier = max(other_positions)
+        else:
+            failed_count = self.paced_fail_fast_count(lane)
+            frontier = len(self.cases)
+
+        while (
+            failed_count
+            and lane.case_indexes
+            and lane.case_indexes[0] < frontier
+        ):
+            self.reporter.error(
+                lane.case_indexes.popleft(),
+                lane.ai_implementation.id,
+                BenchmarkingStepError.CIRCUIT_OPEN,
+            )
+            failed_count -= 1
+
+    def paced_fail_fast_count(self, lane):
+        """
+        Returns the amount of cases of a lane whose breaker is open to fail
+        by now, i.e. as many as a full window of requests would have gone
+        through since the breaker opened (or cases were last failed), at the
+        typical latency of the ai implementation, or that of its failures if
+        it never answered
+
+        The window is the largest the lane may grow to, as failures have
+        usually shrunk the current one down to a single request
+        """
+        now = time.monotonic()
+        since = lane.breaker.opened_at
+        if lane.failed_fast_until is not None:
+            since = max(since, lane.failed_fast_until)
+
+        latency = self.timeout
+        if lane.latencies or lane.failure_latencies:
+            latency = get_latency_percentiles(
+                lane.latencies or lane.failure_latencies
+            )["p50"]
+        pace = (
+            lane.controller.maximum_window_size
+            * (lane.batch_size or 1)
+            / max(latency, 0.001)
+        )
+
+        # the time of the fraction of a case left over is kept for later
+        failed_count = int((now - since) * pace)
+        lane.failed_fast_until = since + failed_count / pace
+        return failed_count
+
+    def dispatch(self, lane):
+        """
+        Takes the next cases of a lane, marking them as being processed, and
+        returns the pending request for them, whose body is gzipped for the
+        ai implementations accepting it
+        """
+        case_indexes = lane.dispatch()
+        for case_index in case_indexes:
+            self.reporter.processing(case_index, lane.ai_implementation.id)
+
+        body = self.request_body(lane, case_indexes)
+        headers = self.request_headers
+        if lane.gzip_requests and len(body) >= self.gzip_min_size:
+            compressed_body = gzip.compress(
+                body, compresslevel=self.gzip_level
+            )
+            lane.request_bytes_saved += len(body) - len(compressed_body)
+            body = compressed_body
+            headers = {**headers, "Content-Encoding": "gzip"}
+
+        return PendingRequest(lane, case_indexes, body, headers)
+
+    def encoded_size(self, headers):
+        """
+        Returns the size in bytes of a gzipped response body as sent by the
+        ai implementation, none if it was not compressed (or not sized)
+        """
+        if headers.get("Content-Encoding") != "gzip":
+            return None
+        try:
+            return int(headers["Content-Length"])
+        except (KeyError, ValueError):
+            return None
+
+    def request_body(self, lane, case_indexes):
+        """
+        Returns the encoded body of the request for the given cases, which is
+        spliced together from json fragments rather than encoded as a whole
+        """
+        if not lane.batched:
+            return b"".join(
+                [
+                    b'{"caseData":',
+                    self.encoded_case_data[case_indexes[0]],
+                    b',"aiImplementation":',
+                    lane.encoded_name,
+                    b"}",
+                ]
+            )
+
+        return b"".join(
+            [
+                b'{"cases":[',
+                b",".join(
+                    b"".join(
+                        [
+                            b'{"caseId":',
+                            self.encoded_case_ids[case_index],
+                            b',"caseData":',
+                            self.encoded_case_data[case_index],
+                            b"}",
+                        ]
+                    )
+                    for case_index in case_indexes
+                ),
+                b'],"aiImplementation":',
+                lane.encoded_name,
+                b"}",
+            ]
+        )
+
+    def is_transient(self, status_code):
+        """
+        Informs whether an attempt failed transiently, i.e. it could not
+        reach the ai implementation (no status code) or got a 5xx response
+        """
+        return status_code is None or status_code >= 500
+
+    def record_attempt(self, request, status_code, content, trace):
+        """
+        Hands an attempt that has just finished over to the recorder, if
+        any, along with the status code and raw content of its response
+        (none if it could not reach the ai implementation)
+        """
+        if self.recorder is not None:
+            self.recorder.record(request, status_code, content, trace)
+
+    def finish_attempt(self, request, status_code):
+        """
+        Accounts for an attempt of a request that has just finished with the
+        given status code (none if it could not reach the ai implementation)
+        and returns whether its outcome is to be reported along with the
+        backoff in seconds before retrying the request, if it is to be
+
+        Attempts finishing after another attempt of the same request are
+        ignored, as are transient failures while another attempt is still
+        in flight
+        """
+        request.in_flight -= 1
+        if request.finished:
+            return False, None
+
+        if not self.is_transient(status_code):
+            return True, None
+
+        if request.in_flight:
+            return False, None
+
+        if request.retries >= self.retry_policy.max_retries:
+            return True, None
+
+        # a transient failure is still a sign of overload
+        request.lane.controller.overloaded()
+        request.retries += 1
+        request.lane.retries += 1
+        return False, self.retry_policy.backoff(request.retries)
+
+    def hedge(self, request):
+        """
+        Informs whether a request still waiting for its single attempt
+        should be sent a second time, as it takes longer than usual
+        """
+        hedge_time = self.hedge_time(request)
+        if hedge_time is None or time.monotonic() < hedge_time:
+            return False
+
+        request.hedges += 1
+        request.lane.hedges += 1
+        return True
+
+    def hedge_time(self, request):
+        """
+        Returns the monotonic time after which a request gets hedged, none if
+        it never does
+        """
+        hedge_delay = request.lane.hedge_delay
+        if (
+            not self.hedging
+            or hedge_delay is None
+            or request.finished
+            or request.in_flight != 1
+            or request.hedges
+        ):
+            return None
+        return request.sent_at + hedge_delay
+
+    def report_step_error(self, lane, case_index, error, error_reason=None):
+        """
+        Reports a failed step, keeping track of those showing the ai
+        implementation is unavailable
+        """
+        if error in (
+            BenchmarkingStepError.TIMEOUT,
+            BenchmarkingStepError.SERVER_ERROR,
+        ):
+            lane.breaker.record_failure()
+        else:
+            lane.breaker.record_success()
+
+        self.reporter.error(
+            case_index, lane.ai_implementation.id, error, error_reason
+        )
+
+    def report_step_completed(self, lane, case_index, ai_response):
+        """Reports a step successfully answered by the ai implementation"""
+        lane.breaker.record_success()
+        self.reporter.completed(
+            case_index, lane.ai_implementation.id, ai_response
+        )
+
+    def report_error(self, lane, case_indexes, error, error_reason=None):
+        """Reports the same error for all the cases of a request"""
+        for case_index in case_indexes:
+            self.report_step_error(lane, case_index, error, error_reason)
+
+    def report_trace(self, request, trace):
+        """
+        Records the trace of the attempt that finished a request, along with
+        the amount of retries and hedges, on each of its steps
+        """
+        trace = trace.to_dict()
+        trace.update({"retries": request.retries, "hedges": request.hedges})
+        for case_index in request.case_indexes:
+            self.reporter.trace(
+                case_index, request.lane.ai_implementation.id, trace
+            )
+
+    def report_timeout(self, request, trace):
+        """Reports a request that could not reach the ai implementation"""
+        request.finished = True
+        request.lane.controller.overloaded()
+        request.lane.record_failure_latency(trace.latency)
+        self.report_trace(request, trace)
+        self.report_error(
+            request.lane, request.case_indexes, BenchmarkingStepError.TIMEOUT,
+        )
+
+    def report_unreadable_response(self, request, trace, error):
+        """
+        Reports a request whose response could not be read, e.g. a truncated
+        or badly encoded body, as a server error
+        """
+        request.finished = True
+        request.lane.controller.overloaded()
+        request.lane.record_failure_latency(trace.latency)
+        self.report_trace(request, trace)
+        self.report_error(
+            request.lane,
+            request.case_indexes,
+            BenchmarkingStepError.SERVER_ERROR,
+            f"response: {error.__class__.__name__}",
+        )
+
+    def report_response(self, request, status_code, content, trace):
+        """
+        Evaluates the HTTP status code and raw content of a response, whose
+        timings are recorded by `trace`, and reports its outcome for each of
+        the cases of the request
+
+        The solve-cases endpoint answers with `{"results": [...]}`, holding
+        one solve-case response for each case, in the order they were sent
+        """
+        request.finished = True
+        lane, case_indexes = request.lane, request.case_indexes
+        if status_code >= 500:
+            lane.controller.overloaded()
+            lane.record_failure_latency(trace.latency)
+        else:
+            lane.controller.healthy(trace.latency)
+            lane.record_latency(trace.latency)
+        if trace.encoded_response_size is not None:
+            lane.response_bytes_saved += (
+                trace.response_size - trace.encoded_response_size
+            )
+        self.report_trace(request, trace)
+
+        try:
+            ai_response = json.loads(content)
+        except ValueError:
+            self.report_error(
+                lane,
+                case_indexes,
+                BenchmarkingStepError.SERVER_ERROR,
+                "response: invalid json",
+            )
+            return
+
+        if status_code >= 400:
+            self.report_error(
+                lane,
+                case_indexes,
+                BenchmarkingStepError.SERVER_ERROR,
+                f"response: HTTP {status_code}",
+            )
+            return
+
+        if isinstance(ai_response, dict) and "error" in ai_response:
+            self.report_error(
+                lane, case_indexes, BenchmarkingStepError.SERVER_ERROR
+            )
+            return
+
+        if not lane.batched:
+            self.report_case_response(lane, case_indexes[0], ai_response)
+            return
+
+        results = (
+            ai_response.get("results")
+            if isinstance(ai_response, dict)
+            else None
+        )
+        if not isinstance(results, list) or len(results) != len(case_indexes):
+            self.report_error(
+                lane,
+                case_indexes,
+                BenchmarkingStepError.BAD_RESPONSE,
+                "results: expected one result per case",
+            )
+            return
+
+        for case_index, case_response in zip(case_indexes, results):
+            self.report_case_response(lane, case_index, case_response)
+
+    def report_case_response(self, lane, case_index, ai_response):
+        """
+        Evaluates and reports the response of an ai for a single case, which
+        is validated against the response schema
+        """
+        if isinstance(ai_response, dict) and "error" in ai_response:
+            self.report_step_error(
+                lane, case_index, BenchmarkingStepError.SERVER_ERROR
+            )
+            return
+
+        error_reason = self.validate_response(ai_response)
+        if error_reason is not None:
+            self.report_step_error(
+                lane,
+                case_index,
+                BenchmarkingStepError.BAD_RESPONSE,
+                error_reason,
+            )
+            return
+
+        self.report_step_completed(lane, case_index, ai_response)
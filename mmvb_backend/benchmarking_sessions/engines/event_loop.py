@@ -0,0 +1,187 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+from django.conf import settings
+from django.db import connections
+from django.utils.decorators import classproperty
+
+from common.connections import get_client_session, get_event_loop
+
+from .base import Engine
+
+
+class AsyncioEngine(Engine):
+    """
+    Engine sending all requests from a single asyncio event loop, which
+    allows for a large amount of requests in flight without spawning a
+    thread for each of them
+    """
+
+    @classproperty
+    def name(cls) -> str:
+        """Returns Engine name"""
+        return "asyncio"
+
+    @classproperty
+    def window_size(cls) -> int:
+        """Returns the upper bound of requests in flight per ai"""
+        return settings.BENCHMARKING_SESSION_ASYNCIO_WINDOW_SIZE
+
+    def run(self):
+        """Sends the cases to the ai implementations from an event loop"""
+        # django forbids database queries from a running event loop, so the
+        # checkpoints taken while running are saved from a thread of their
+        # own, whose database connection is closed afterwards
+        checkpoint = getattr(self.reporter, "checkpoint", None)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            if checkpoint is not None:
+                self.reporter.checkpoint = lambda steps: executor.submit(
+                    checkpoint, steps
+                ).result()
+            try:
+                # the event loop outlives the run, along with its pooled
+                # connections
+                get_event_loop().run_until_complete(self._run())
+            finally:
+                if checkpoint is not None:
+                    self.reporter.checkpoint = checkpoint
+                executor.submit(connections.close_all)
+
+    async def _run(self):
+        """Runs the lanes of all ai implementations concurrently"""
+        lanes = [
+            asyncio.ensure_future(
+                self._run_lane(get_client_session(lane.base_url), lane)
+            )
+            for lane in self.lanes
+        ]
+        try:
+            await asyncio.gather(*lanes)
+        finally:
+            # the event loop is shared, so nothing may be left running on it
+            # after an unexpected error
+            for lane in lanes:
+                lane.cancel()
+
+    async def _run_lane(self, session, lane):
+        """Keeps the window of a lane full until all its cases are solved"""
+        requests = set()
+        try:
+            await self._fill_lane(session, lane, requests)
+        finally:
+            for request in requests:
+                request.cancel()
+
+    async def _fill_lane(self, session, lane, requests):
+        """
+        Sends the cases of a lane, keeping track of its requests in flight
+        in `requests`, which are cancelled once the execution stops early
+        """
+        while not lane.finished and not self.check_stopped():
+            self.fail_fast(lane)
+            while lane.can_dispatch():
+                requests.add(
+                    asyncio.ensure_future(
+                        self._solve_cases(session, self.dispatch(lane))
+                    )
+                )
+
+            if not requests:
+                # the circuit breaker of the lane is open
+                if lane.case_indexes:
+                    await asyncio.sleep(self.poll_interval)
+                continue
+
+            # wakes up regularly as other lanes may allow failing fast, and
+            # the execution may have to stop
+            finished, _ = await asyncio.wait(
+                requests,
+                timeout=self.poll_interval,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for request in finished:
+                requests.remove(request)
+                # propagates unexpected errors, as the threaded engine does
+                request.result()
+
+    async def _solve_cases(self, session, request):
+        """
+        Sends a request to the lane's ai implementation, retrying it after
+        transient failures and hedging it when it takes longer than usual
+        """
+        attempts = {self._send(session, request)}
+        try:
+            while attempts:
+                hedge_time = self.hedge_time(request)
+                finished, attempts = await asyncio.wait(
+                    attempts,
+                    timeout=None
+                    if hedge_time is None
+                    else max(hedge_time - time.monotonic(), 0),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+
+                for attempt in finished:
+                    trace, status_code, content, error = attempt.result()
+                    self.record_attempt(request, status_code, content, trace)
+                    report, backoff = self.finish_attempt(request, status_code)
+                    if backoff is not None:
+                        await asyncio.sleep(backoff)
+                        attempts.add(self._send(session, request))
+                    if not report:
+                        continue
+
+                    if error is not None:
+                        self.report_unreadable_response(request, trace, error)
+                    elif status_code is None:
+                        self.report_timeout(request, trace)
+                    else:
+                        self.report_response(
+                            request, status_code, content, trace
+                        )
+                    return
+
+                if self.hedge(request):
+                    attempts.add(self._send(session, request))
+        finally:
+            # attempts outrun by the one reported are no longer needed
+            for attempt in attempts:
+                attempt.cancel()
+            request.lane.release()
+
+    def _send(self, session, request):
+        """
+        Schedules an attempt of a request, which is counted as in flight
+        straight away
+        """
+        return asyncio.ensure_future(
+            self._attempt(session, request, request.attempt())
+        )
+
+    async def _attempt(self, session, request, trace):
+        """
+        Sends a single attempt of a request, returning its trace along with
+        the status code and content of the response, none if it could not
+        reach the ai implementation, and the error its response could not be
+        read with, if any (being failed transiently like unreachable ones)
+        """
+        try:
+            async with session.post(
+                request.lane.endpoint,
+                data=request.body,
+                headers=request.headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            ) as response:
+                trace.mark_first_byte()
+                content = await response.read()
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            trace.mark_completed()
+            return trace, None, None, None
+        except aiohttp.ClientError as error:
+            trace.mark_completed()
+            return trace, None, None, error
+
+        trace.mark_completed(len(content), self.encoded_size(response.headers))
+        return trace, response.status, content, None
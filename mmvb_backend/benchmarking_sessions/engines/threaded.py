@@ -0,0 +1,194 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.utils.decorators import classproperty
+from requests import ConnectionError, ReadTimeout, RequestException
+from requests_futures.sessions import FuturesSession
+
+from common.connections import get_session
+
+from .base import Engine
+
+
+class ThreadedEngine(Engine):
+    """
+    Engine sending requests from a thread pool, with one thread for each
+    attempt in flight
+    """
+
+    @classproperty
+    def name(cls) -> str:
+        """Returns Engine name"""
+        return "threaded"
+
+    @classproperty
+    def window_size(cls) -> int:
+        """Returns the upper bound of requests in flight per ai"""
+        return settings.BENCHMARKING_SESSION_WINDOW_SIZE
+
+    def run(self):
+        """Sends the cases to the ai implementations from a thread pool"""
+        # hedged requests may take up a second thread
+        self.executor = ThreadPoolExecutor(
+            max_workers=max(
+                sum(lane.controller.maximum_window_size for lane in self.lanes)
+                * (2 if self.hedging else 1),
+                1,
+            )
+        )
+        # requests go through the connection pools of the worker process
+        self.lane_sessions = {
+            lane: FuturesSession(
+                executor=self.executor, session=get_session(lane.base_url),
+            )
+            for lane in self.lanes
+        }
+        self.attempt_request_map = {}
+        # requests waiting for their backoff, with the time they are retried
+        self.retries = []
+
+        # handles requests as they finish and refills the windows, waking up
+        # for retries, hedges and lanes waiting on their circuit breaker
+        while not self.finished:
+            self.send_due_requests()
+
+            timeout = max(self.next_wakeup(), 0)
+            if not self.attempt_request_map:
+                if not self.finished:
+                    time.sleep(timeout)
+                continue
+
+            finished, _ = wait(
+                self.attempt_request_map,
+                timeout=timeout,
+                return_when=FIRST_COMPLETED,
+            )
+            for attempt in finished:
+                self.handle_attempt(attempt)
+
+        # attempts still in flight when stopping early are abandoned, the
+        # ones not yet started being cancelled and the others left to end
+        # on their thread (requests cannot be interrupted)
+        for attempt in self.attempt_request_map:
+            attempt.cancel()
+        self.executor.shutdown(wait=self.stopped is None)
+
+    def drain(self):
+        """Waits for the attempts abandoned when stopping early to end"""
+        self.executor.shutdown(wait=True)
+
+    def send_due_requests(self):
+        """
+        Fills the windows of the lanes and sends the retries and hedges that
+        are due
+        """
+        for lane in self.lanes:
+            self.fail_fast(lane)
+            while lane.can_dispatch():
+                self.send(self.dispatch(lane))
+
+        for retry in list(self.retries):
+            retry_time, request = retry
+            if retry_time <= time.monotonic():
+                self.retries.remove(retry)
+                self.send(request)
+
+        for request, _ in list(self.attempt_request_map.values()):
+            if self.hedge(request):
+                self.send(request)
+
+    def next_wakeup(self):
+        """
+        Returns the seconds until the next retry or hedge is due, or until
+        lanes waiting on their circuit breaker are checked again
+        """
+        wakeup_times = [retry_time for retry_time, _ in self.retries] + [
+            self.hedge_time(request)
+            for request, _ in self.attempt_request_map.values()
+        ]
+        return min(
+            [
+                wakeup_time - time.monotonic()
+                for wakeup_time in wakeup_times
+                if wakeup_time is not None
+            ]
+            + [self.poll_interval]
+        )
+
+    def send(self, request):
+        """Sends an attempt of a request to the lane's ai implementation"""
+        trace = request.attempt()
+        attempt = self.lane_sessions[request.lane].post(
+            request.lane.endpoint,
+            data=request.body,
+            headers=request.headers,
+            timeout=self.timeout,
+            stream=True,
+            hooks={"response": self.trace_response(trace)},
+        )
+        self.attempt_request_map[attempt] = (request, trace)
+
+    def trace_response(self, trace):
+        """
+        Returns a response hook recording the timings of an attempt, run by
+        its thread as soon as the response headers are received
+        """
+
+        def hook(response, *args, **kwargs):
+            trace.mark_first_byte()
+            trace.mark_sent(
+                trace.first_byte - response.elapsed.total_seconds()
+            )
+            # the body is only read once the response has been streamed
+            trace.mark_completed(
+                len(response.content), self.encoded_size(response.headers)
+            )
+
+        return hook
+
+    def handle_attempt(self, attempt):
+        """
+        Handles a finished attempt, retrying its request or reporting the
+        outcome of the request
+        """
+        request, trace = self.attempt_request_map.pop(attempt)
+
+        # responses that could not be read (e.g. truncated bodies) are failed
+        # transiently like the requests that could not reach the ai
+        attempt_exception = attempt.exception(timeout=0)
+        error = None
+        if isinstance(attempt_exception, (ConnectionError, ReadTimeout)):
+            trace.mark_completed()
+            response = None
+        elif isinstance(attempt_exception, RequestException):
+            trace.mark_completed()
+            response = None
+            error = attempt_exception
+        else:
+            response = attempt.result(timeout=0)
+
+        if response is None:
+            self.record_attempt(request, None, None, trace)
+        else:
+            self.record_attempt(
+                request, response.status_code, response.content, trace
+            )
+
+        report, backoff = self.finish_attempt(
+            request, None if response is None else response.status_code
+        )
+        if backoff is not None:
+            self.retries.append((time.monotonic() + backoff, request))
+        if not report:
+            return
+
+        request.lane.release()
+        if error is not None:
+            self.report_unreadable_response(request, trace, error)
+        elif response is None:
+            self.report_timeout(request, trace)
+        else:
+            self.report_response(
+                request, response.status_code, response.content, trace
+            )
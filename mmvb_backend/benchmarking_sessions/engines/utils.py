@@ -0,0 +1,243 @@
+import random
+import time
+
+from django.conf import settings
+
+LATENCY_TOLERANCE = settings.BENCHMARKING_SESSION_LATENCY_TOLERANCE
+
+
+class AIMDController:
+    """
+    Adapts the amount of requests in flight to an ai implementation in the
+    fashion of TCP congestion control (additive increase, multiplicative
+    decrease): the window grows by one request for each full window of
+    healthy responses and is halved whenever the ai implementation shows
+    signs of overload, i.e. timeouts, connection errors, 5xx responses or
+    a latency well above the lowest one seen
+    """
+
+    # weight of the latest latency in the moving average
+    LATENCY_SMOOTHING = 0.2
+
+    def __init__(self, initial_window_size, maximum_window_size):
+        self.maximum_window_size = max(maximum_window_size, 1)
+        self.limit = float(min(initial_window_size, self.maximum_window_size))
+        self.peak_window_size = self.window_size
+
+        self.min_latency = None
+        self.average_latency = None
+
+        # a whole window of requests sent before a decrease may fail, which
+        # must count as a single overload signal
+        self.responses_since_decrease = self.window_size
+
+    @property
+    def window_size(self):
+        """Returns the current maximum amount of requests in flight"""
+        return max(1, min(self.maximum_window_size, int(self.limit)))
+
+    def resize(self, maximum_window_size):
+        """
+        Changes the upper bound of the window, shrinking the window straight
+        away if it is above
+        """
+        self.maximum_window_size = max(maximum_window_size, 1)
+        self.limit = min(self.limit, float(self.maximum_window_size))
+
+    def healthy(self, latency):
+        """Records a successful response, which took `latency` seconds"""
+        if self.min_latency is None or latency < self.min_latency:
+            self.min_latency = latency
+        if self.average_latency is None:
+            self.average_latency = latency
+        else:
+            self.average_latency += self.LATENCY_SMOOTHING * (
+                latency - self.average_latency
+            )
+
+        if self.average_latency > LATENCY_TOLERANCE * self.min_latency:
+            self.overloaded()
+            return
+
+        self.responses_since_decrease += 1
+        self.limit = min(
+            self.maximum_window_size, self.limit + 1 / self.window_size
+        )
+        self.peak_window_size = max(self.peak_window_size, self.window_size)
+
+    def overloaded(self):
+        """Records a response showing that the ai implementation is overloaded"""
+        self.responses_since_decrease += 1
+        if self.responses_since_decrease < self.window_size:
+            return
+
+        self.limit = max(1.0, self.limit / 2)
+        self.responses_since_decrease = 0
+        # latency is expected to improve with less requests in flight
+        self.average_latency = self.min_latency
+
+
+class FixedWindowController:
+    """
+    Keeps a constant amount of requests in flight to an ai implementation,
+    whatever its responses, for load tests measuring how it copes with a
+    given concurrency
+    """
+
+    def __init__(self, window_size):
+        self.window_size = max(window_size, 1)
+        self.maximum_window_size = self.window_size
+        self.peak_window_size = self.window_size
+
+    def resize(self, maximum_window_size):
+        """The window is fixed, so it is not bounded any further"""
+
+    def healthy(self, latency):
+        """Successful responses leave the window as it is"""
+
+    def overloaded(self):
+        """Signs of overload leave the window as it is"""
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to an ai implementation once a given amount of
+    consecutive steps failed with a timeout or a server error
+
+    Once open, the breaker lets a single probe request through every
+    `reset_timeout` seconds (half open): it closes again if the probe is
+    answered, or goes back to open otherwise
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.openings = 0
+
+    @property
+    def is_open(self):
+        """Informs whether requests are currently being refused"""
+        return self.state == self.OPEN and not self._reset_timeout_elapsed()
+
+    def _reset_timeout_elapsed(self):
+        """Informs whether it is time for probing the ai implementation"""
+        return time.monotonic() - self.opened_at >= self.reset_timeout
+
+    def allow_request(self):
+        """
+        Informs whether a request may be sent, turning the breaker half open
+        for a single probe once the reset timeout has elapsed
+        """
+        if self.state == self.CLOSED:
+            return True
+
+        if self.state == self.OPEN and self._reset_timeout_elapsed():
+            self.state = self.HALF_OPEN
+            return True
+
+        return False
+
+    def _open(self):
+        """Starts refusing requests"""
+        if self.state != self.OPEN:
+            self.openings += 1
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+
+    def record_success(self):
+        """Records a step answered by the ai implementation"""
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+
+    def record_failure(self):
+        """Records a step failed with a timeout or a server error"""
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or (
+            self.state == self.CLOSED
+            and self.consecutive_failures >= self.failure_threshold
+        ):
+            self._open()
+
+
+class RequestTrace:
+    """
+    Records when a request to an ai implementation was queued, sent, started
+    being answered (first byte) and completed, in seconds since the epoch,
+    along with the sizes of its request and response bodies
+    """
+
+    def __init__(self, request_size, queued=None):
+        self.queued = time.time() if queued is None else queued
+        self.sent = None
+        self.first_byte = None
+        self.completed = None
+        self.request_size = request_size
+        self.response_size = None
+        self.encoded_response_size = None
+
+    @property
+    def latency(self):
+        """Seconds between sending the request and completing it"""
+        if self.sent is None or self.completed is None:
+            return None
+        return self.completed - self.sent
+
+    def mark_sent(self, at=None):
+        """Records the request as sent"""
+        self.sent = time.time() if at is None else at
+
+    def mark_first_byte(self):
+        """Records the response as started"""
+        self.first_byte = time.time()
+
+    def mark_completed(self, response_size=None, encoded_response_size=None):
+        """
+        Records the request as completed, whether answered or not, along with
+        the size of the response body before decompression, if compressed
+        """
+        self.completed = time.time()
+        self.response_size = response_size
+        self.encoded_response_size = encoded_response_size
+
+    def to_dict(self):
+        """Returns the trace as recorded on the steps of the request"""
+        return {
+            "timings": {
+                timing: value
+                for timing, value in (
+                    ("queued", self.queued),
+                    ("sent", self.sent),
+                    ("firstByte", self.first_byte),
+                    ("completed", self.completed),
+                )
+                if value is not None
+            },
+            "requestSize": self.request_size,
+            "responseSize": self.response_size,
+        }
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter: the n-th retry waits a random
+    amount of seconds up to `backoff * 2 ** (n - 1)`, capped to
+    `max_backoff`, so that retries of concurrent requests spread out
+    """
+
+    def __init__(self, max_retries, backoff, max_backoff):
+        self.max_retries = max_retries
+        self.backoff_base = backoff
+        self.max_backoff = max_backoff
+
+    def backoff(self, retry):
+        """Returns the seconds to wait before the given retry"""
+        return random.uniform(
+            0, min(self.max_backoff, self.backoff_base * 2 ** (retry - 1))
+        )
@@ -0,0 +1,215 @@
+import math
+
+from django.conf import settings
+
+from benchmarking_sessions.models import (
+    BenchmarkingResponse,
+    BenchmarkingSession,
+    BenchmarkingStepError,
+    BenchmarkingStepStatus,
+)
+
+BATCH_SIZE = settings.BENCHMARKING_SESSION_BATCH_SIZE
+INITIAL_WINDOW_SIZE = settings.BENCHMARKING_SESSION_INITIAL_WINDOW_SIZE
+MAX_RETRIES = settings.BENCHMARKING_SESSION_MAX_RETRIES
+SAMPLE_SIZE = settings.BENCHMARKING_SESSION_ESTIMATE_SAMPLE_SIZE
+SESSION_SAMPLE_SIZE = (
+    settings.BENCHMARKING_SESSION_ESTIMATE_SESSION_SAMPLE_SIZE
+)
+
+# errors retried by the engines, i.e. transient failures
+TRANSIENT_ERRORS = {
+    BenchmarkingStepError.TIMEOUT.value,
+    BenchmarkingStepError.SERVER_ERROR.value,
+}
+
+
+def get_ai_statistics(ai_implementation_id):
+    """
+    Returns the rolling statistics of an ai implementation over its latest
+    steps requested by past sessions: the mean latency of its requests,
+    the mean amount of steps per request, its error rate and the rate of
+    transient failures, along with the concurrency it settled on in its
+    latest sessions, e.g.
+    `{"sampleSize": 1000, "latency": 0.2, "batchSize": 20, "errorRate": 0.01,
+      "transientErrorRate": 0.01, "concurrency": 12}`
+
+    Figures are none for ai implementations without history
+    """
+    # steps never sent (e.g. failed fast) have no timings to speak of
+    steps = [
+        (timings, status, error)
+        for timings, status, error in BenchmarkingResponse.objects.filter(
+            ai_implementation_id=ai_implementation_id,
+            timings__isnull=False,
+            cached=False,
+        )
+        .order_by("-created_on")
+        .values_list("timings", "status", "error")[:SAMPLE_SIZE]
+        if "sent" in timings and "completed" in timings
+    ]
+
+    # the steps of a batched request share the timings of the request
+    request_latencies = {}
+    error_count = 0
+    transient_error_count = 0
+    for timings, status, error in steps:
+        request_latencies[(timings["queued"], timings["completed"])] = (
+            timings["completed"] - timings["sent"]
+        )
+        if status == BenchmarkingStepStatus.ERRORED.value:
+            error_count += 1
+            transient_error_count += error in TRANSIENT_ERRORS
+
+    settled_window_sizes = [
+        statistics["concurrency"][str(ai_implementation_id)]["settled"]
+        for statistics in BenchmarkingSession.objects.filter(
+            ai_implementations=ai_implementation_id, statistics__isnull=False,
+        )
+        .order_by("-created_on")
+        .values_list("statistics", flat=True)[:SESSION_SAMPLE_SIZE]
+        if str(ai_implementation_id) in statistics.get("concurrency", {})
+    ]
+
+    return {
+        "sampleSize": len(steps),
+        "latency": (
+            sum(request_latencies.values()) / len(request_latencies)
+            if request_latencies
+            else None
+        ),
+        "batchSize": (
+            len(steps) / len(request_latencies) if request_latencies else None
+        ),
+        "errorRate": error_count / len(steps) if steps else None,
+        "transientErrorRate": (
+            transient_error_count / len(steps) if steps else None
+        ),
+        "concurrency": (
+            sum(settled_window_sizes) / len(settled_window_sizes)
+            if settled_window_sizes
+            else None
+        ),
+    }
+
+
+def estimate_ai_runtime(step_count, ai_statistics, batch_size, max_retries):
+    """
+    Returns the estimated amount of requests (retries included) and
+    wall-clock time in seconds for an ai implementation to answer
+    `step_count` steps, given its rolling statistics
+    """
+    if ai_statistics["latency"] is None:
+        return {"requestCount": step_count, "duration": None}
+
+    batch_size = max(1, min(batch_size, ai_statistics["batchSize"]))
+    request_count = math.ceil(step_count / batch_size)
+
+    # a request failing transiently is retried up to max retries times
+    transient_error_rate = ai_statistics["transientErrorRate"]
+    attempts_per_request = sum(
+        transient_error_rate ** retry for retry in range(max_retries + 1)
+    )
+    attempt_count = math.ceil(request_count * attempts_per_request)
+
+    concurrency = ai_statistics["concurrency"] or INITIAL_WINDOW_SIZE
+    return {
+        "requestCount": attempt_count,
+        "duration": attempt_count * ai_statistics["latency"] / concurrency,
+    }
+
+
+def estimate_runtime(benchmarking_session):
+    """
+    Returns the estimated amount of requests and wall-clock time in seconds
+    of running a benchmark session, from its amount of cases not yet
+    finished and the rolling statistics of its ai implementations, e.g.
+    `{"duration": 120.5, "requestCount": 400,
+      "aiImplementations": {<ai id>: {"stepCount": 200, ...}, ...}}`
+
+    Ai implementations run alongside each other, so the session lasts as
+    long as the slowest of them, its duration being none if any of them has
+    no history
+    """
+    case_count = benchmarking_session.get_cases().count()
+    batch_size = benchmarking_session.batch_size or BATCH_SIZE
+    max_retries = (
+        MAX_RETRIES
+        if benchmarking_session.max_retries is None
+        else benchmarking_session.max_retries
+    )
+
+    ai_estimates = {}
+    for ai_implementation in benchmarking_session.ai_implementations.all():
+        # steps finished by a previous execution are not requested again
+        step_count = case_count - (
+            benchmarking_session.benchmarking_responses.filter(
+                ai_implementation=ai_implementation
+            ).count()
+        )
+        ai_statistics = get_ai_statistics(ai_implementation.id)
+        ai_estimates[str(ai_implementation.id)] = {
+            "stepCount": step_count,
+            **estimate_ai_runtime(
+                step_count, ai_statistics, batch_size, max_retries
+            ),
+            **ai_statistics,
+        }
+
+    durations = [
+        ai_estimate["duration"] for ai_estimate in ai_estimates.values()
+    ]
+    return {
+        "duration": None if None in durations else max(durations, default=0),
+        "requestCount": sum(
+            ai_estimate["requestCount"]
+            for ai_estimate in ai_estimates.values()
+        ),
+        "aiImplementations": ai_estimates,
+    }
+
+
+def get_eta(statistics, estimate):
+    """
+    Returns the estimated amount of seconds left before a running benchmark
+    session is finished, given its progress statistics and the estimate
+    made before it started (if any), none if unknown
+
+    The remaining time of each ai implementation blends the one expected
+    from its estimate with the one expected from its current throughput,
+    the latter weighing more as the ai implementation gets through its cases
+    """
+    total_case_count = statistics["totalCaseCount"]
+    ai_estimates = (estimate or {}).get("aiImplementations", {})
+
+    etas = []
+    for ai_id, counters in statistics["table"].items():
+        finished_count = sum(counters.values())
+        remaining_count = total_case_count - finished_count
+        if remaining_count <= 0:
+            etas.append(0)
+            continue
+        progress = finished_count / total_case_count if total_case_count else 1
+
+        throughput = statistics["performance"][ai_id]["throughput"]
+        live_eta = remaining_count / throughput if throughput else None
+
+        ai_estimate = ai_estimates.get(ai_id, {})
+        estimated_eta = None
+        if ai_estimate.get("duration") is not None:
+            estimated_eta = (
+                ai_estimate["duration"]
+                * remaining_count
+                / max(ai_estimate["stepCount"], 1)
+            )
+
+        if live_eta is None and estimated_eta is None:
+            return None
+        if live_eta is None:
+            etas.append(estimated_eta)
+        elif estimated_eta is None:
+            etas.append(live_eta)
+        else:
+            etas.append(progress * live_eta + (1 - progress) * estimated_eta)
+
+    return max(etas, default=0)
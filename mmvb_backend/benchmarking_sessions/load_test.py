@@ -0,0 +1,240 @@
+import time
+
+from django.conf import settings
+
+from benchmarking_sessions.models import BenchmarkingSession
+from benchmarking_sessions.performance import get_latency_percentiles
+
+LOAD_LEVELS = settings.BENCHMARKING_SESSION_LOAD_LEVELS
+LOAD_STEP_DURATION = settings.BENCHMARKING_SESSION_LOAD_STEP_DURATION
+LOAD_MAX_ERROR_RATE = settings.BENCHMARKING_SESSION_LOAD_MAX_ERROR_RATE
+
+# amount of requests per request in flight replayed by each pass over the
+# case set, so that the windows seldom drain between two passes
+PASS_LENGTH = 100
+
+
+class LoadTestReporter:
+    """
+    Stands in for the benchmark reporter while load testing, counting the
+    outcomes of the steps and keeping the latencies of the answered requests
+    instead of recording responses
+
+    Each pass of an engine replays the case set from the start as many
+    times as needed for `step_count` steps
+    """
+
+    def __init__(self, case_count, step_count):
+        self.case_count = case_count
+        self.step_count = step_count
+        self.latencies = []
+        self.request_count = 0
+        self.completed_count = 0
+        self.errors = {}
+
+    def pending_case_indexes(self, ai_implementation_id):
+        """Returns the indexes of the cases replayed by a pass"""
+        return [
+            step_index % self.case_count
+            for step_index in range(self.step_count)
+        ]
+
+    def processing(self, case_index, ai_implementation_id):
+        """Steps being processed are not tracked"""
+
+    def trace(self, case_index, ai_implementation_id, trace):
+        """Records the latency of a request, if it was answered"""
+        self.request_count += 1
+        timings = trace["timings"]
+        if "firstByte" in timings:
+            self.latencies.append(timings["completed"] - timings["sent"])
+
+    def completed(self, case_index, ai_implementation_id, ai_response):
+        """Counts a step successfully answered"""
+        self.completed_count += 1
+
+    def error(
+        self, case_index, ai_implementation_id, error, error_reason=None
+    ):
+        """Counts a failed step by error"""
+        self.errors[error.value] = self.errors.get(error.value, 0) + 1
+
+    def measurements(self, concurrency, duration):
+        """
+        Returns what was measured at the given concurrency over `duration`
+        seconds, e.g. `{"concurrency": 8, "throughput": 40.2,
+          "errorRate": 0.01, "latency": {"p50": 0.18, ...}, ...}`
+        """
+        error_count = sum(self.errors.values())
+        finished_count = self.completed_count + error_count
+        return {
+            "concurrency": concurrency,
+            "duration": duration,
+            "requestCount": self.request_count,
+            "completedCount": self.completed_count,
+            "errorCount": error_count,
+            "errors": self.errors,
+            "throughput": (
+                self.completed_count / duration if duration > 0 else None
+            ),
+            "requestRate": (
+                self.request_count / duration if duration > 0 else None
+            ),
+            "errorRate": (
+                error_count / finished_count if finished_count else None
+            ),
+            "latency": get_latency_percentiles(self.latencies),
+        }
+
+
+def run_load_step(
+    engine_class,
+    cases,
+    ai_implementation,
+    concurrency,
+    deadline,
+    gzip_requests=None,
+    is_cancelled=None,
+):
+    """
+    Replays the cases against the ai implementation keeping `concurrency`
+    requests in flight until the deadline (a unix timestamp), and returns
+    the measurements of the step along with the status the engine stopped
+    with, i.e. timed out unless it was cancelled
+
+    Requests carry a single case each, so that measurements are comparable
+    between ai implementations, and failed requests are not retried
+    """
+    reporter = LoadTestReporter(
+        len(cases), max(len(cases), concurrency * PASS_LENGTH)
+    )
+    started_at = time.monotonic()
+    stopped = None
+    engine = None
+    while stopped is None:
+        engine = engine_class(
+            cases,
+            [ai_implementation],
+            reporter,
+            gzip_requests=gzip_requests,
+            deadline=deadline,
+            is_cancelled=is_cancelled,
+            concurrency=concurrency,
+        )
+        engine.run()
+        stopped = engine.stopped
+
+    measurements = reporter.measurements(
+        concurrency, time.monotonic() - started_at
+    )
+
+    # requests abandoned at the deadline of the step are waited for, so that
+    # they do not add up to the concurrency of the next one
+    if stopped != BenchmarkingSession.Status.CANCELLED:
+        engine.drain()
+
+    return measurements, stopped
+
+
+def run_load_test(
+    benchmarking_session,
+    engine_class,
+    cases,
+    gzip_requests=None,
+    deadline=None,
+    is_cancelled=None,
+    on_step=None,
+):
+    """
+    Runs the steps of a load test session against its single ai
+    implementation, one for each of its concurrency levels in turn, and
+    returns its capacity curve along with the status it stopped early with
+    (none if it went through its levels)
+
+    Levels are given up once a step goes beyond the maximum error rate, as
+    the ai implementation is overloaded already, and `on_step` is called
+    with the capacity curve so far after every step
+    """
+    ai_implementation = benchmarking_session.ai_implementations.get()
+    load_levels = benchmarking_session.load_levels or LOAD_LEVELS
+    step_duration = benchmarking_session.load_step_duration or (
+        LOAD_STEP_DURATION
+    )
+
+    capacity_curve = []
+    for concurrency in load_levels:
+        step_deadline = time.time() + step_duration
+        if deadline is not None and deadline <= step_deadline:
+            step_deadline = deadline
+
+        measurements, stopped = run_load_step(
+            engine_class,
+            cases,
+            ai_implementation,
+            concurrency,
+            step_deadline,
+            gzip_requests=gzip_requests,
+            is_cancelled=is_cancelled,
+        )
+        capacity_curve.append(measurements)
+        if on_step is not None:
+            on_step(capacity_curve)
+
+        if stopped == BenchmarkingSession.Status.CANCELLED:
+            return capacity_curve, stopped
+        if deadline is not None and time.time() >= deadline:
+            return capacity_curve, BenchmarkingSession.Status.TIMED_OUT
+        if (measurements["errorRate"] or 0) > LOAD_MAX_ERROR_RATE:
+            break
+
+    return capacity_curve, None
+
+
+def get_load_test_progress(benchmarking_session):
+    """
+    Returns the progress of a running load test session, read from the steps
+    of its capacity curve saved so far, e.g. `{"levelCount": 6,
+      "finishedLevelCount": 2, "currentLevel": 4, "elapsed": 65.2}`, along
+    with the seconds it has left, assuming it goes through all its levels
+    """
+    load_levels = benchmarking_session.load_levels or LOAD_LEVELS
+    step_duration = benchmarking_session.load_step_duration or (
+        LOAD_STEP_DURATION
+    )
+    finished_level_count = len(benchmarking_session.capacity_curve or [])
+    elapsed = None
+    if benchmarking_session.started_on is not None:
+        elapsed = time.time() - benchmarking_session.started_on.timestamp()
+
+    # the current step started once the previous ones had run for their
+    # duration (roughly, leaving aside the pre-flight)
+    eta = (len(load_levels) - finished_level_count) * step_duration
+    if elapsed is not None:
+        eta -= max(elapsed - finished_level_count * step_duration, 0)
+
+    progress = {
+        "levelCount": len(load_levels),
+        "finishedLevelCount": finished_level_count,
+        "currentLevel": (
+            load_levels[finished_level_count]
+            if finished_level_count < len(load_levels)
+            else None
+        ),
+        "elapsed": elapsed,
+    }
+    return progress, max(eta, 0)
+
+
+def get_peak_step(capacity_curve):
+    """
+    Returns the step of a capacity curve with the highest throughput within
+    the maximum error rate, i.e. the capacity of the ai implementation, none
+    if no step was
+    """
+    steps = [
+        step
+        for step in capacity_curve
+        if step["throughput"] is not None
+        and (step["errorRate"] or 0) <= LOAD_MAX_ERROR_RATE
+    ]
+    return max(steps, key=lambda step: step["throughput"], default=None)
@@ -0,0 +1,107 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from benchmarking_sessions.validation import (
+    SchemaCompiler,
+    get_response_schema,
+)
+from common.definitions import FIXTURES_DATA, TRIAGE_OPTIONS
+
+
+class Command(BaseCommand):
+    """
+    Micro-benchmark of the validation of the responses of the ai
+    implementations, timing the compiled validator on valid and invalid
+    responses (and the jsonschema package on the same ones, if installed)
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--quantity", type=int, default=100000)
+
+    def handle(self, *args, **options):
+        quantity = options["quantity"]
+        schema = get_response_schema()
+
+        started_at = time.perf_counter()
+        validate = SchemaCompiler().compile(schema)
+        self.stdout.write(
+            f"Compiled the validator in "
+            f"{(time.perf_counter() - started_at) * 1000:.2f}ms"
+        )
+
+        valid_responses = [self.valid_response() for _ in range(quantity)]
+        invalid_responses = [
+            self.invalid_response(response) for response in valid_responses
+        ]
+        self.time("compiled", "valid", validate, valid_responses)
+        self.time("compiled", "invalid", validate, invalid_responses)
+
+        try:
+            import jsonschema
+        except ImportError:
+            self.stdout.write(
+                self.style.WARNING(
+                    "jsonschema is not installed, skipping the comparison"
+                )
+            )
+            return
+
+        validator = jsonschema.Draft7Validator(schema)
+
+        def validate_with_jsonschema(response):
+            error = jsonschema.exceptions.best_match(
+                validator.iter_errors(response)
+            )
+            return None if error is None else error.message
+
+        self.time(
+            "jsonschema", "valid", validate_with_jsonschema, valid_responses
+        )
+        self.time(
+            "jsonschema",
+            "invalid",
+            validate_with_jsonschema,
+            invalid_responses,
+        )
+
+    def time(self, name, kind, validate, responses):
+        """Validates the given responses, reporting the time per response"""
+        started_at = time.perf_counter()
+        rejected_count = sum(
+            validate(response) is not None for response in responses
+        )
+        duration = time.perf_counter() - started_at
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{name} validator, {kind} responses: "
+                f"{duration / len(responses) * 1e6:.2f}µs per response "
+                f"({len(responses) / duration:.0f} per second, "
+                f"{rejected_count} rejected)"
+            )
+        )
+
+    def valid_response(self):
+        """Returns a response like the ones of the toy ais"""
+        return {
+            "triage": random.choice(TRIAGE_OPTIONS),
+            "conditions": [
+                {"id": condition["id"], "name": condition["short_name"]}
+                for condition in random.sample(
+                    FIXTURES_DATA["conditions"], random.randint(0, 5)
+                )
+            ],
+        }
+
+    def invalid_response(self, response):
+        """Returns a copy of a valid response broken in a random way"""
+        response = {**response, "conditions": list(response["conditions"])}
+        fault = random.choice(["triage", "conditions", "condition id"])
+        if fault == "triage":
+            response["triage"] = "unknown"
+        elif fault == "conditions":
+            response["conditions"] = {}
+        else:
+            response["conditions"].append({"id": "unknown"})
+        return response
@@ -0,0 +1,88 @@
+import cProfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarking_sessions.models import BenchmarkingSession
+from benchmarking_sessions.recording import ReplayServer, load_recording
+from benchmarking_sessions.tasks import run_benchmark
+
+
+class Command(BaseCommand):
+    """
+    Replays a benchmark session recorded with `record_exchanges` without
+    requesting its ai implementations: a copy of the session is run in this
+    process against a replay server serving the recorded responses, with
+    their original latencies or at max speed, optionally under the profiler
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("benchmarking_session_id")
+        parser.add_argument(
+            "--speed",
+            choices=[ReplayServer.ORIGINAL, ReplayServer.MAX],
+            default=ReplayServer.ORIGINAL,
+        )
+        parser.add_argument(
+            "--engine", choices=BenchmarkingSession.Engine.values
+        )
+        parser.add_argument(
+            "--profile", help="file the profiler statistics are dumped to"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            recorded_session = BenchmarkingSession.objects.get(
+                id=options["benchmarking_session_id"]
+            )
+            preflight, exchanges = load_recording(recorded_session.id)
+        except (BenchmarkingSession.DoesNotExist, FileNotFoundError) as exc:
+            raise CommandError(f"Error replaying the session. Got {exc}")
+
+        server = ReplayServer(preflight, exchanges, speed=options["speed"])
+        replay_url = server.start()
+        self.stdout.write(
+            f"Replaying {len(exchanges)} exchanges from {replay_url}"
+        )
+
+        # the copy is run as the recorded session was, only not recording
+        # nor serving cached responses, and without shards as the replay
+        # server is only reachable from this process
+        benchmarking_session = BenchmarkingSession.objects.create(
+            case_set=recorded_session.case_set,
+            engine=options["engine"] or recorded_session.engine,
+            batch_size=recorded_session.batch_size,
+            max_retries=recorded_session.max_retries,
+            hedged_requests=recorded_session.hedged_requests,
+            replay_url=replay_url,
+        )
+        benchmarking_session.ai_implementations.set(
+            recorded_session.ai_implementations.all()
+        )
+
+        profiler = cProfile.Profile() if options["profile"] else None
+        started_at = time.perf_counter()
+        try:
+            if profiler is not None:
+                profiler.enable()
+            result = run_benchmark.apply(args=(benchmarking_session.id,))
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(options["profile"])
+            server.stop()
+        duration = time.perf_counter() - started_at
+
+        if result.failed():
+            raise CommandError(
+                f"Error replaying the session. Got {result.result!r}"
+            )
+
+        benchmarking_session.refresh_from_db()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Replayed benchmark session {recorded_session.id} as "
+                f"{benchmarking_session.id} <{benchmarking_session.status}> "
+                f"in {duration:.2f}s"
+            )
+        )
@@ -0,0 +1,22 @@
+# Generated by Django 3.0.14 on 2026-10-18 09:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("benchmarking_sessions", "0002_auto_20200514_0933"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="benchmarkingsession",
+            name="engine",
+            field=models.CharField(
+                choices=[("threaded", "Threaded"), ("asyncio", "Asyncio")],
+                default="threaded",
+                max_length=50,
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 3.0.14 on 2026-10-18 09:14
+
+import django_mysql.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("benchmarking_sessions", "0003_session_engine"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="benchmarkingsession",
+            name="shard_size",
+            field=models.PositiveIntegerField(
+                blank=True, default=None, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="benchmarkingsession",
+            name="shard_task_ids",
+            field=django_mysql.models.JSONField(
+                blank=True, default=dict, null=True
+            ),
+        ),
+    ]
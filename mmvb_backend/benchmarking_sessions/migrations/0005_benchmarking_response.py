@@ -0,0 +1,99 @@
+# Generated by Django 3.0.14 on 2026-10-18 09:18
+
+import uuid
+
+import django.db.models.deletion
+import django_mysql.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ai_implementations", "0001_initial"),
+        ("cases", "0003_auto_20200727_1348"),
+        ("benchmarking_sessions", "0004_session_shards"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BenchmarkingResponse",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_on", models.DateTimeField(auto_now_add=True)),
+                ("modified_on", models.DateTimeField(auto_now=True)),
+                ("case_index", models.PositiveIntegerField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PENDING", "PENDING"),
+                            ("PROCESSING", "PROCESSING"),
+                            ("COMPLETED", "COMPLETED"),
+                            ("ERRORED", "ERRORED"),
+                        ],
+                        db_index=True,
+                        max_length=50,
+                    ),
+                ),
+                (
+                    "error",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("TIMEOUT", "TIMEOUT"),
+                            ("SERVER_ERROR", "SERVER_ERROR"),
+                            ("BAD_RESPONSE", "BAD_RESPONSE"),
+                        ],
+                        db_index=True,
+                        default=None,
+                        max_length=50,
+                        null=True,
+                    ),
+                ),
+                (
+                    "value",
+                    django_mysql.models.JSONField(
+                        blank=True, default=dict, null=True
+                    ),
+                ),
+                (
+                    "ai_implementation",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="ai_implementations.AIImplementation",
+                    ),
+                ),
+                (
+                    "benchmarking_session",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="benchmarking_responses",
+                        to="benchmarking_sessions.BenchmarkingSession",
+                    ),
+                ),
+                (
+                    "case",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="cases.Case",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {
+                    ("benchmarking_session", "case", "ai_implementation")
+                },
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 3.0.14 on 2026-10-18 09:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("benchmarking_sessions", "0005_benchmarking_response"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="benchmarkingsession",
+            name="batch_size",
+            field=models.PositiveIntegerField(
+                blank=True, default=None, null=True
+            ),
+        ),
+    ]
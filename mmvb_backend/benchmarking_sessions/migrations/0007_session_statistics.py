@@ -0,0 +1,21 @@
+# Generated by Django 3.0.14 on 2026-10-18 09:21
+
+import django_mysql.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("benchmarking_sessions", "0006_session_batch_size"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="benchmarkingsession",
+            name="statistics",
+            field=django_mysql.models.JSONField(
+                blank=True, default=dict, null=True
+            ),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 3.0.14 on 2026-10-18 09:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("benchmarking_sessions", "0007_session_statistics"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="benchmarkingresponse",
+            name="error",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("TIMEOUT", "TIMEOUT"),
+                    ("SERVER_ERROR", "SERVER_ERROR"),
+                    ("BAD_RESPONSE", "BAD_RESPONSE"),
+                    ("CIRCUIT_OPEN", "CIRCUIT_OPEN"),
+                ],
+                db_index=True,
+                default=None,
+                max_length=50,
+                null=True,
+            ),
+        ),
+    ]
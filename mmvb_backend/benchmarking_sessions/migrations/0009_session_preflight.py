@@ -0,0 +1,39 @@
+# Generated by Django 3.0.14 on 2026-10-18 09:25
+
+import django_mysql.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("benchmarking_sessions", "0008_step_error_circuit_open"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="benchmarkingsession",
+            name="preflight",
+            field=django_mysql.models.JSONField(
+                blank=True, default=dict, null=True
+            ),
+        ),
+        migrations.AlterField(
+            model_name="benchmarkingresponse",
+            name="error",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("TIMEOUT", "TIMEOUT"),
+                    ("SERVER_ERROR", "SERVER_ERROR"),
+                    ("BAD_RESPONSE", "BAD_RESPONSE"),
+                    ("CIRCUIT_OPEN", "CIRCUIT_OPEN"),
+                    ("UNAVAILABLE", "UNAVAILABLE"),
+                ],
+                db_index=True,
+                default=None,
+                max_length=50,
+                null=True,
+            ),
+        ),
+    ]
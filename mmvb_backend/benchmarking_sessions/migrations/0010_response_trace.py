@@ -0,0 +1,35 @@
+# Generated by Django 3.0.14 on 2026-10-18 09:27
+
+import django_mysql.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("benchmarking_sessions", "0009_session_preflight"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="benchmarkingresponse",
+            name="request_size",
+            field=models.PositiveIntegerField(
+                blank=True, default=None, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="benchmarkingresponse",
+            name="response_size",
+            field=models.PositiveIntegerField(
+                blank=True, default=None, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="benchmarkingresponse",
+            name="timings",
+            field=django_mysql.models.JSONField(
+                blank=True, default=dict, null=True
+            ),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 3.0.14 on 2026-10-18 09:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("benchmarking_sessions", "0010_response_trace"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="benchmarkingresponse",
+            name="hedge_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="benchmarkingresponse",
+            name="retry_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="benchmarkingsession",
+            name="hedged_requests",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="benchmarkingsession",
+            name="max_retries",
+            field=models.PositiveIntegerField(
+                blank=True, default=None, null=True
+            ),
+        ),
+    ]
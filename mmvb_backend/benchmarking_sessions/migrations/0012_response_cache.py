@@ -0,0 +1,60 @@
+# Generated by Django 3.0.14 on 2026-10-18 09:35
+
+import uuid
+
+import django.db.models.deletion
+import django_mysql.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ai_implementations", "0002_ai_implementation_version"),
+        ("benchmarking_sessions", "0011_retries_and_hedges"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="benchmarkingresponse",
+            name="cached",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="benchmarkingsession",
+            name="use_cache",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name="CachedResponse",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_on", models.DateTimeField(auto_now_add=True)),
+                ("modified_on", models.DateTimeField(auto_now=True)),
+                ("version", models.CharField(max_length=50)),
+                ("case_data_hash", models.CharField(max_length=64)),
+                ("value", django_mysql.models.JSONField(default=dict)),
+                (
+                    "ai_implementation",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="ai_implementations.AIImplementation",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {
+                    ("ai_implementation", "version", "case_data_hash")
+                },
+            },
+        ),
+    ]
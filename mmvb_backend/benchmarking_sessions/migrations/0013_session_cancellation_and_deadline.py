@@ -0,0 +1,41 @@
+# Generated by Django 3.0.14 on 2026-10-18 09:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("benchmarking_sessions", "0012_response_cache"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="benchmarkingsession",
+            name="deadline",
+            field=models.PositiveIntegerField(
+                blank=True, default=None, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="benchmarkingsession",
+            name="started_on",
+            field=models.DateTimeField(blank=True, default=None, null=True),
+        ),
+        migrations.AlterField(
+            model_name="benchmarkingsession",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("created", "Created"),
+                    ("running", "Running"),
+                    ("intermediate", "Intermediate"),
+                    ("finished", "Finished"),
+                    ("cancelled", "Cancelled"),
+                    ("timed_out", "Timed Out"),
+                ],
+                default="created",
+                max_length=50,
+            ),
+        ),
+    ]
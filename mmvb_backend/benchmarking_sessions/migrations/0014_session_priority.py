@@ -0,0 +1,26 @@
+# Generated by Django 3.0.14 on 2026-10-18 09:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("benchmarking_sessions", "0013_session_cancellation_and_deadline"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="benchmarkingsession",
+            name="priority",
+            field=models.CharField(
+                choices=[
+                    ("interactive", "Interactive"),
+                    ("normal", "Normal"),
+                    ("batch", "Batch"),
+                ],
+                default="normal",
+                max_length=50,
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 3.0.14 on 2026-10-18 09:48
+
+import django_mysql.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("benchmarking_sessions", "0014_session_priority"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="benchmarkingsession",
+            name="estimate",
+            field=django_mysql.models.JSONField(
+                blank=True, default=dict, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="benchmarkingresponse",
+            index=models.Index(
+                fields=["ai_implementation", "created_on"],
+                name="benchmarkin_ai_impl_a0da7e_idx",
+            ),
+        ),
+    ]
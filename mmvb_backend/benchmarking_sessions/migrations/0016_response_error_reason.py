@@ -0,0 +1,20 @@
+# Generated by Django 3.0.14 on 2026-10-18 09:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("benchmarking_sessions", "0015_session_estimate"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="benchmarkingresponse",
+            name="error_reason",
+            field=models.CharField(
+                blank=True, default=None, max_length=255, null=True
+            ),
+        ),
+    ]
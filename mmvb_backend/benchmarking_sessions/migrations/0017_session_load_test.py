@@ -0,0 +1,47 @@
+# Generated by Django 3.0.14 on 2026-10-18 09:54
+
+import django_mysql.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("benchmarking_sessions", "0016_response_error_reason"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="benchmarkingsession",
+            name="capacity_curve",
+            field=django_mysql.models.JSONField(
+                blank=True, default=dict, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="benchmarkingsession",
+            name="kind",
+            field=models.CharField(
+                choices=[
+                    ("benchmark", "Benchmark"),
+                    ("load_test", "Load Test"),
+                ],
+                default="benchmark",
+                max_length=50,
+            ),
+        ),
+        migrations.AddField(
+            model_name="benchmarkingsession",
+            name="load_levels",
+            field=django_mysql.models.JSONField(
+                blank=True, default=dict, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="benchmarkingsession",
+            name="load_step_duration",
+            field=models.PositiveIntegerField(
+                blank=True, default=None, null=True
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.0.14 on 2026-10-18 09:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("benchmarking_sessions", "0017_session_load_test"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="benchmarkingsession",
+            name="record_exchanges",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="benchmarkingsession",
+            name="replay_url",
+            field=models.URLField(blank=True, default=None, null=True),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 3.0.14 on 2026-10-18 10:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("benchmarking_sessions", "0019_session_derived_from"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="benchmarkingsession",
+            name="early_stopping_confidence",
+            field=models.FloatField(blank=True, default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name="benchmarkingsession",
+            name="early_stopping_metric",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("triage_match", "Triage Match"),
+                    ("correct_conditions_top_1", "Correct Conditions Top 1"),
+                    ("correct_conditions_top_3", "Correct Conditions Top 3"),
+                    ("correct_conditions_top_10", "Correct Conditions Top 10"),
+                ],
+                default=None,
+                max_length=50,
+                null=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="benchmarkingsession",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("created", "Created"),
+                    ("running", "Running"),
+                    ("intermediate", "Intermediate"),
+                    ("finished", "Finished"),
+                    ("cancelled", "Cancelled"),
+                    ("timed_out", "Timed Out"),
+                    ("settled", "Settled"),
+                ],
+                default="created",
+                max_length=50,
+            ),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.0.14 on 2026-10-18 10:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("benchmarking_sessions", "0020_session_early_stopping"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="benchmarkingsession",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("created", "Created"),
+                    ("running", "Running"),
+                    ("intermediate", "Intermediate"),
+                    ("finished", "Finished"),
+                    ("cancelled", "Cancelled"),
+                    ("timed_out", "Timed Out"),
+                    ("settled", "Settled"),
+                    ("errored", "Errored"),
+                ],
+                default="created",
+                max_length=50,
+            ),
+        ),
+    ]
@@ -1,6 +1,9 @@
 from enum import Enum
+from posixpath import join as urljoin
 
+from django.conf import settings
 from django.db import models
+from django.db.models import F, Func, Value
 from django_mysql.models import JSONField
 
 from common.models import BaseModel
@@ -21,6 +24,10 @@ class BenchmarkingStepError(Enum):
     TIMEOUT = "TIMEOUT"
     SERVER_ERROR = "SERVER_ERROR"
     BAD_RESPONSE = "BAD_RESPONSE"
+    # the ai implementation was not requested as it kept failing
+    CIRCUIT_OPEN = "CIRCUIT_OPEN"
+    # the ai implementation failed its health check before the session
+    UNAVAILABLE = "UNAVAILABLE"
 
 
 class BenchmarkingSession(BaseModel):
@@ -33,6 +40,57 @@ class BenchmarkingSession(BaseModel):
         RUNNING = "running"
         INTERMEDIATE = "intermediate"
         FINISHED = "finished"
+        # stopped before all cases were solved, through the cancel endpoint
+        # or by reaching the deadline of the session
+        CANCELLED = "cancelled"
+        TIMED_OUT = "timed_out"
+        # stopped before all cases were solved, as the ranking of the ai
+        # implementations was settled (see `early_stopping_metric`)
+        SETTLED = "settled"
+        # stopped as one of its executions failed unexpectedly (e.g. a
+        # shard), its responses so far being kept for running it again
+        ERRORED = "errored"
+
+    class Engine(models.TextChoices):
+        """
+        Definition of possible engines for sending the cases of a benchmark
+        session to the ai implementations
+        """
+
+        THREADED = "threaded"
+        ASYNCIO = "asyncio"
+
+    class Priority(models.TextChoices):
+        """
+        Definition of possible priority classes of a benchmark session, each
+        of them being run from its own celery queue
+        """
+
+        INTERACTIVE = "interactive"
+        NORMAL = "normal"
+        BATCH = "batch"
+
+    class Kind(models.TextChoices):
+        """
+        Definition of possible kinds of benchmark session: benchmarks send
+        their case set once to each of their ai implementations, while load
+        tests replay it against a single one at increasing concurrency
+        levels, measuring its capacity curve
+        """
+
+        BENCHMARK = "benchmark"
+        LOAD_TEST = "load_test"
+
+    class RankingMetric(models.TextChoices):
+        """
+        Definition of possible metrics the ai implementations of a benchmark
+        session with early stopping are ranked by
+        """
+
+        TRIAGE_MATCH = "triage_match"
+        CORRECT_CONDITIONS_TOP_1 = "correct_conditions_top_1"
+        CORRECT_CONDITIONS_TOP_3 = "correct_conditions_top_3"
+        CORRECT_CONDITIONS_TOP_10 = "correct_conditions_top_10"
 
     status = models.CharField(
         max_length=50, choices=Status.choices, default=Status.CREATED,
@@ -47,6 +105,353 @@ class BenchmarkingSession(BaseModel):
         max_length=50, default=None, blank=True, null=True
     )
     responses = JSONField(blank=True, null=True)
+    engine = models.CharField(
+        max_length=50, choices=Engine.choices, default=Engine.THREADED,
+    )
+    # amount of cases per shard, for splitting the session across workers
+    shard_size = models.PositiveIntegerField(
+        default=None, blank=True, null=True
+    )
+    shard_task_ids = JSONField(blank=True, null=True)
+    # maximum amount of cases per request to the ai implementations
+    # supporting solve-cases, 1 disabling batches altogether
+    batch_size = models.PositiveIntegerField(
+        default=None, blank=True, null=True
+    )
+    # statistics recorded while running the session, e.g. the concurrency
+    # settled on for each ai implementation
+    statistics = JSONField(blank=True, null=True)
+    # outcome of the health check of each ai implementation before running
+    preflight = JSONField(blank=True, null=True)
+    # amount of times a request failing transiently (timeout, connection
+    # error or 5xx) is retried, and whether requests taking longer than
+    # the p95 latency of their ai implementation are sent a second time
+    max_retries = models.PositiveIntegerField(
+        default=None, blank=True, null=True
+    )
+    hedged_requests = models.BooleanField(default=False)
+    # whether responses cached by previous sessions are served instead of
+    # requesting the ai implementations again (see `CachedResponse`)
+    use_cache = models.BooleanField(default=False)
+    # maximum amount of seconds the session may run for, counting from when
+    # it started running, after which it is stopped as timed out
+    deadline = models.PositiveIntegerField(default=None, blank=True, null=True)
+    started_on = models.DateTimeField(default=None, blank=True, null=True)
+    # priority class, deciding the queue the session is run from and its
+    # share of the capacity while running alongside other sessions
+    priority = models.CharField(
+        max_length=50, choices=Priority.choices, default=Priority.NORMAL,
+    )
+    # runtime and amount of requests estimated when the session started
+    estimate = JSONField(blank=True, null=True)
+    kind = models.CharField(
+        max_length=50, choices=Kind.choices, default=Kind.BENCHMARK,
+    )
+    # amounts of requests in flight a load test goes through, each of them
+    # for the given amount of seconds, and what it measured at each level
+    load_levels = JSONField(blank=True, null=True)
+    load_step_duration = models.PositiveIntegerField(
+        default=None, blank=True, null=True
+    )
+    capacity_curve = JSONField(blank=True, null=True)
+    # whether the HTTP exchanges with the ai implementations are recorded to
+    # disk, and the replay server the ai implementations are requested
+    # through instead of their own, for sessions replaying a recording
+    record_exchanges = models.BooleanField(default=False)
+    replay_url = models.URLField(default=None, blank=True, null=True)
+    # finished session the completed responses of the pairs of case and ai
+    # implementation unchanged since are copied from, instead of requesting
+    # them again, for extending it with new ai implementations or cases
+    derived_from = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        default=None,
+        blank=True,
+        null=True,
+        related_name="+",
+    )
+    # metric the ai implementations are ranked by, for sessions evaluating
+    # their cases in random order and stopping once the ranking is settled
+    # at the given confidence, none running all cases
+    early_stopping_metric = models.CharField(
+        max_length=50,
+        choices=RankingMetric.choices,
+        default=None,
+        blank=True,
+        null=True,
+    )
+    early_stopping_confidence = models.FloatField(
+        default=None, blank=True, null=True
+    )
 
     def __str__(self):
         return f"{self.id} <{self.status}>"
+
+    @property
+    def queue(self):
+        """Returns the celery queue the session is run from"""
+        return settings.BENCHMARKING_SESSION_QUEUES[self.priority]
+
+    def get_deadline(self, resumed_on=None):
+        """
+        Returns the unix timestamp the session is to be stopped at, counting
+        from when it started running (or from `resumed_on`, for executions
+        resuming it) and bounded by the longest deadline allowed, for its
+        task to finish before the broker redelivers it
+        """
+        deadline = settings.BENCHMARKING_SESSION_MAX_DEADLINE
+        if self.deadline is not None:
+            deadline = min(self.deadline, deadline)
+        return (resumed_on or self.started_on).timestamp() + deadline
+
+    def get_base_urls(self):
+        """
+        Returns the base url of each ai implementation of the session on the
+        replay server, keyed by id, or none if the session is not a replay
+        """
+        if not self.replay_url:
+            return None
+
+        return {
+            str(ai_implementation_id): urljoin(
+                self.replay_url, str(ai_implementation_id)
+            )
+            for ai_implementation_id in self.ai_implementations.values_list(
+                "id", flat=True
+            )
+        }
+
+    def get_cases(self):
+        """
+        Returns the cases of the session in a stable order, so that every
+        worker agrees on the case indexes
+        """
+        return self.case_set.cases.order_by("id")
+
+    def get_raw_cases(self):
+        """
+        Returns the cases of the session as `get_cases` does, but without
+        decoding their data: the raw json text of their case data is read
+        as `raw_case_data` instead, to be sent to the ai implementations as is
+        """
+        return (
+            self.get_cases()
+            .defer("data")
+            .annotate(
+                raw_case_data=Func(
+                    F("data"),
+                    Value("$.caseData"),
+                    function="JSON_EXTRACT",
+                    output_field=models.TextField(),
+                )
+            )
+        )
+
+    def get_responses(self):
+        """
+        Returns the responses of the session grouped by case, as consumed by
+        the results endpoint and the metrics
+
+        Responses are read from the benchmarking response table, on top of
+        the legacy `responses` field for sessions that ran before it existed
+        """
+        ai_implementation_ids = [
+            str(ai_implementation_id)
+            for ai_implementation_id in self.ai_implementations.values_list(
+                "id", flat=True
+            )
+        ]
+        responses = {
+            str(case_id): {
+                "caseId": str(case_id),
+                "caseIndex": case_index,
+                "responses": {
+                    ai_implementation_id: {
+                        "status": BenchmarkingStepStatus.PENDING.value
+                    }
+                    for ai_implementation_id in ai_implementation_ids
+                },
+            }
+            for case_index, case_id in enumerate(
+                self.get_cases().values_list("id", flat=True)
+            )
+        }
+
+        for case_responses in self.responses or []:
+            if case_responses["caseId"] in responses:
+                responses[case_responses["caseId"]]["responses"].update(
+                    case_responses["responses"]
+                )
+
+        benchmarking_responses = self.benchmarking_responses.values_list(
+            "case_id",
+            "ai_implementation_id",
+            "status",
+            "error",
+            "error_reason",
+            "value",
+            "cached",
+        )
+        for (
+            case_id,
+            ai_implementation_id,
+            step_status,
+            error,
+            error_reason,
+            value,
+            cached,
+        ) in benchmarking_responses.iterator():
+            case_responses = responses.get(str(case_id))
+            if case_responses is None:
+                continue
+
+            response = {"status": step_status}
+            if error is not None:
+                response["error"] = error
+            if error_reason is not None:
+                response["errorReason"] = error_reason
+            if value is not None:
+                response["value"] = value
+            if cached:
+                response["cached"] = True
+            case_responses["responses"][str(ai_implementation_id)] = response
+
+        return list(responses.values())
+
+    def get_stored_responses(self, case_ids, with_values=False):
+        """
+        Returns the responses stored for the given cases of the session, for
+        an execution of theirs to resume from, grouped by case as
+        `get_responses` does but leaving out the cases without any
+
+        Only the status and error of each step are read, along with its
+        value if `with_values` (e.g. for ranking the ai implementations)
+        """
+        case_ids = {str(case_id) for case_id in case_ids}
+        responses = {
+            case_responses["caseId"]: {
+                "caseId": case_responses["caseId"],
+                "responses": dict(case_responses["responses"]),
+            }
+            for case_responses in self.responses or []
+            if case_responses["caseId"] in case_ids
+        }
+
+        fields = ["case_id", "ai_implementation_id", "status", "error"]
+        if with_values:
+            fields.append("value")
+        benchmarking_responses = self.benchmarking_responses.filter(
+            case_id__in=case_ids
+        ).values(*fields)
+        for benchmarking_response in benchmarking_responses.iterator():
+            case_id = str(benchmarking_response["case_id"])
+            response = {"status": benchmarking_response["status"]}
+            if benchmarking_response["error"] is not None:
+                response["error"] = benchmarking_response["error"]
+            if benchmarking_response.get("value") is not None:
+                response["value"] = benchmarking_response["value"]
+            case_responses = responses.setdefault(
+                case_id, {"caseId": case_id, "responses": {}}
+            )
+            case_responses["responses"][
+                str(benchmarking_response["ai_implementation_id"])
+            ] = response
+
+        return list(responses.values())
+
+
+class BenchmarkingResponse(BaseModel):
+    """
+    Data model representation for the response of an AI Implementation to
+    a case of a Benchmark Session
+    """
+
+    benchmarking_session = models.ForeignKey(
+        "BenchmarkingSession",
+        on_delete=models.CASCADE,
+        related_name="benchmarking_responses",
+    )
+    case = models.ForeignKey(
+        "cases.Case", on_delete=models.CASCADE, related_name="+",
+    )
+    ai_implementation = models.ForeignKey(
+        "ai_implementations.AIImplementation",
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    case_index = models.PositiveIntegerField()
+    status = models.CharField(
+        max_length=50,
+        choices=[
+            (status.value, status.name) for status in BenchmarkingStepStatus
+        ],
+        db_index=True,
+    )
+    error = models.CharField(
+        max_length=50,
+        choices=[(error.value, error.name) for error in BenchmarkingStepError],
+        default=None,
+        blank=True,
+        null=True,
+        db_index=True,
+    )
+    # why the response was not accepted, e.g. which part of it is invalid
+    error_reason = models.CharField(
+        max_length=255, default=None, blank=True, null=True
+    )
+    value = JSONField(blank=True, null=True)
+    # seconds since the epoch at which the request for the step was queued,
+    # sent, started being answered and completed
+    timings = JSONField(blank=True, null=True)
+    # sizes in bytes of the request and response bodies, shared by all the
+    # steps of a batched request
+    request_size = models.PositiveIntegerField(
+        default=None, blank=True, null=True
+    )
+    response_size = models.PositiveIntegerField(
+        default=None, blank=True, null=True
+    )
+    # amount of times the request for the step was retried and hedged
+    retry_count = models.PositiveIntegerField(default=0)
+    hedge_count = models.PositiveIntegerField(default=0)
+    # whether the response was reused rather than requested, i.e. served
+    # from the cache of responses or copied from the session the session was
+    # derived from
+    cached = models.BooleanField(default=False)
+
+    class Meta:
+        unique_together = [
+            ("benchmarking_session", "case", "ai_implementation")
+        ]
+        # for the rolling statistics of the latest steps of each ai
+        indexes = [models.Index(fields=["ai_implementation", "created_on"])]
+
+    def __str__(self):
+        return (
+            f"{self.benchmarking_session_id} {self.case_index} <{self.status}>"
+        )
+
+
+class CachedResponse(BaseModel):
+    """
+    Data model representation for a response of a given version of an AI
+    Implementation to some case data, reused across Benchmark Sessions
+    """
+
+    ai_implementation = models.ForeignKey(
+        "ai_implementations.AIImplementation",
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    version = models.CharField(max_length=50)
+    # sha256 of the json of the case data sent to the ai, as stored
+    case_data_hash = models.CharField(max_length=64)
+    value = JSONField()
+
+    class Meta:
+        unique_together = [("ai_implementation", "version", "case_data_hash")]
+
+    def __str__(self):
+        return (
+            f"{self.ai_implementation_id} {self.version} {self.case_data_hash}"
+        )
@@ -0,0 +1,31 @@
+import math
+
+PERCENTILES = (50, 95, 99)
+
+
+def get_latency_percentiles(latencies):
+    """
+    Returns the given percentiles (nearest rank) of a list of latencies in
+    seconds, e.g. `{"p50": 0.12, "p95": 0.4, "p99": 1.3}`
+    """
+    if not latencies:
+        return {f"p{percentile}": None for percentile in PERCENTILES}
+
+    latencies = sorted(latencies)
+    return {
+        f"p{percentile}": latencies[
+            max(math.ceil(percentile / 100 * len(latencies)) - 1, 0)
+        ]
+        for percentile in PERCENTILES
+    }
+
+
+def get_performance(latencies, step_count, duration):
+    """
+    Returns the latency percentiles of an ai implementation along with its
+    throughput, i.e. the amount of steps it finished per second
+    """
+    return {
+        "latency": get_latency_percentiles(latencies),
+        "throughput": step_count / duration if duration > 0 else None,
+    }
@@ -0,0 +1,118 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed
+
+from django.conf import settings
+from requests import ConnectionError, RequestException
+from rest_framework.status import HTTP_200_OK
+
+from common.connections import get_session
+from common.definitions import HealthCheckStatus
+
+PREFLIGHT_TIMEOUT = settings.BENCHMARKING_SESSION_PREFLIGHT_TIMEOUT
+
+
+def check_health(response):
+    """
+    Evaluates the response of an ai implementation to its health check,
+    returning its pre-flight outcome
+    """
+    if response.status_code != HTTP_200_OK:
+        return {
+            "status": HealthCheckStatus.BAD_RESPONSE.value,
+            "detail": (
+                "Error on health check response. "
+                f"Got HTTP {response.status_code}"
+            ),
+        }
+
+    try:
+        data = response.json()
+    except ValueError:
+        return {
+            "status": HealthCheckStatus.BAD_RESPONSE.value,
+            "detail": "Error trying to parse response (invalid JSON)",
+        }
+
+    outcome = {"status": HealthCheckStatus.OK.value}
+
+    # ai implementations supporting the solve-cases endpoint advertise it
+    # with `{"capabilities": {"solveCases": {"maxBatchSize": <int>}}, ...}`
+    try:
+        capabilities = data.get("capabilities") or {}
+        max_batch_size = int(capabilities["solveCases"]["maxBatchSize"])
+    except (ValueError, AttributeError, KeyError, TypeError):
+        pass
+    else:
+        if max_batch_size > 0:
+            outcome["maxBatchSize"] = max_batch_size
+
+    # ai implementations accepting gzip request bodies advertise it with
+    # `{"capabilities": {"contentEncodings": ["gzip"]}, ...}`
+    try:
+        if "gzip" in data["capabilities"]["contentEncodings"]:
+            outcome["gzipRequests"] = True
+    except (KeyError, TypeError):
+        pass
+
+    return outcome
+
+
+def run_preflight(
+    ai_implementations, timeout=PREFLIGHT_TIMEOUT, base_urls=None
+):
+    """
+    Requests the health check of all given ai implementations at once and
+    returns the outcome for each of them, e.g.
+    `{<ai implementation id>: {"status": "ok", "maxBatchSize": 20}}`
+
+    Ai implementations not answering within the timeout are reported with
+    a timeout status, the whole pre-flight never lasting much longer. They
+    are requested through `base_urls` (keyed by id) when given, as engines do
+    """
+    base_urls = base_urls or {}
+    executor = ThreadPoolExecutor(max_workers=max(len(ai_implementations), 1))
+    # health checks go through the connection pools of the worker process,
+    # which are then warm for the session
+    request_ai_implementation_map = {}
+    for ai_implementation in ai_implementations:
+        base_url = base_urls.get(
+            str(ai_implementation.id), ai_implementation.base_url
+        )
+        request = executor.submit(
+            get_session(base_url).get,
+            f"{base_url}/health-check",
+            timeout=timeout,
+        )
+        request_ai_implementation_map[request] = ai_implementation
+
+    preflight = {
+        str(ai_implementation.id): {
+            "status": HealthCheckStatus.TIMEOUT.value,
+            "detail": "No health check response in time",
+        }
+        for ai_implementation in ai_implementations
+    }
+    try:
+        for request in as_completed(
+            request_ai_implementation_map, timeout=timeout
+        ):
+            ai_implementation = request_ai_implementation_map[request]
+            try:
+                outcome = check_health(request.result())
+            except ConnectionError as exc:
+                outcome = {
+                    "status": HealthCheckStatus.TIMEOUT.value,
+                    "detail": f"Error trying to perform request. Got {exc}",
+                }
+            except RequestException as exc:
+                outcome = {
+                    "status": HealthCheckStatus.BAD_RESPONSE.value,
+                    "detail": f"Error trying to perform request. Got {exc}",
+                }
+
+            preflight[str(ai_implementation.id)] = outcome
+    except TimeoutError:
+        pass
+
+    # health checks still pending are not waited for
+    executor.shutdown(wait=False)
+    return preflight
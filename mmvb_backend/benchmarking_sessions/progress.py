@@ -0,0 +1,181 @@
+import json
+
+import redis
+from django.conf import settings
+
+PROGRESS_REDIS_URL = settings.BENCHMARKING_SESSION_PROGRESS_REDIS_URL
+PROGRESS_TTL = settings.BENCHMARKING_SESSION_PROGRESS_TTL
+DELTAS_PAGE_SIZE = settings.BENCHMARKING_SESSION_DELTAS_PAGE_SIZE
+
+COUNTERS = ("errors", "timeouts", "completed")
+
+# client of the worker (or web) process, sharing its connection pool
+_redis = None
+
+
+def get_redis():
+    """Returns the redis client keeping the progress of benchmark sessions"""
+    global _redis
+    if _redis is None:
+        _redis = redis.Redis.from_url(PROGRESS_REDIS_URL)
+    return _redis
+
+
+def progress_key(benchmarking_session_id):
+    """Returns the key of the progress hash of a benchmark session"""
+    return f"benchmarking-session:{benchmarking_session_id}:progress"
+
+
+def deltas_key(benchmarking_session_id):
+    """
+    Returns the key of the list of the step status changes of a benchmark
+    session, in the order they were published
+    """
+    return f"benchmarking-session:{benchmarking_session_id}:deltas"
+
+
+def reset_progress(benchmarking_session_id, total_case_count):
+    """
+    Clears the progress of a benchmark session that is about to run,
+    leaving only its total amount of cases
+    """
+    key = progress_key(benchmarking_session_id)
+    pipeline = get_redis().pipeline()
+    pipeline.delete(key, deltas_key(benchmarking_session_id))
+    pipeline.hset(key, "totalCaseCount", total_case_count)
+    pipeline.expire(key, PROGRESS_TTL)
+    pipeline.execute()
+
+
+def clear_progress(benchmarking_session_id):
+    """Removes the progress of a benchmark session no longer running"""
+    get_redis().delete(
+        progress_key(benchmarking_session_id),
+        deltas_key(benchmarking_session_id),
+    )
+
+
+def request_cancellation(benchmarking_session_id):
+    """
+    Flags a running benchmark session as cancelled, for its executions to
+    stop at their next check
+    """
+    key = progress_key(benchmarking_session_id)
+    pipeline = get_redis().pipeline()
+    pipeline.hset(key, "cancelled", 1)
+    pipeline.expire(key, PROGRESS_TTL)
+    pipeline.execute()
+
+
+def is_cancelled(benchmarking_session_id):
+    """Informs whether a running benchmark session was flagged as cancelled"""
+    return bool(
+        get_redis().hexists(progress_key(benchmarking_session_id), "cancelled")
+    )
+
+
+def publish_progress(
+    benchmarking_session_id, statistics, deltas, case_offset=0
+):
+    """
+    Stores the progress counters of the execution running the cases of a
+    benchmark session from `case_offset` onwards, each of its fields being
+    prefixed with that offset so that shards never overwrite each other, e.g.
+    `{"0:currentCaseIndex": 42, "0:<ai id>:completed": 40, ...}`, and
+    appends the step status changes since its last report to the deltas of
+    the session
+    """
+    fields = {
+        f"{case_offset}:currentCaseIndex": statistics["currentCaseIndex"],
+        f"{case_offset}:caseCount": statistics["totalCaseCount"],
+        f"{case_offset}:finishedCaseCount": statistics["finishedCaseCount"],
+    }
+    for ai_id, counters in statistics["table"].items():
+        fields[f"{case_offset}:{ai_id}:caseIndex"] = statistics[
+            "aiCaseIndexes"
+        ][ai_id]
+        for counter in COUNTERS:
+            fields[f"{case_offset}:{ai_id}:{counter}"] = counters[counter]
+        fields[f"{case_offset}:{ai_id}:performance"] = json.dumps(
+            statistics["performance"][ai_id]
+        )
+
+    key = progress_key(benchmarking_session_id)
+    pipeline = get_redis().pipeline()
+    pipeline.hmset(key, fields)
+    pipeline.expire(key, PROGRESS_TTL)
+    if deltas:
+        key = deltas_key(benchmarking_session_id)
+        pipeline.rpush(key, *(json.dumps(delta) for delta in deltas))
+        pipeline.expire(key, PROGRESS_TTL)
+    pipeline.execute()
+
+
+def get_deltas(benchmarking_session_id, cursor=0):
+    """
+    Returns the step status changes of a running benchmark session from the
+    given cursor on (a page of them at most), e.g. `[{"caseIndex": 3,
+    "aiImplementationId": <ai id>, "status": "COMPLETED"}, ...]`, along with
+    the cursor of the ones that follow
+    """
+    deltas = [
+        json.loads(delta)
+        for delta in get_redis().lrange(
+            deltas_key(benchmarking_session_id),
+            cursor,
+            cursor + DELTAS_PAGE_SIZE - 1,
+        )
+    ]
+    return deltas, cursor + len(deltas)
+
+
+def _read_shard_statistics(fields, case_offset, ai_ids):
+    """
+    Returns the statistics of the execution running the cases from
+    `case_offset` onwards out of the fields of a progress hash
+    """
+
+    def get(name):
+        return fields[f"{case_offset}:{name}"]
+
+    return {
+        "currentCaseIndex": int(get("currentCaseIndex")),
+        "totalCaseCount": int(get("caseCount")),
+        "finishedCaseCount": int(get("finishedCaseCount")),
+        "aiCaseIndexes": {
+            ai_id: int(get(f"{ai_id}:caseIndex")) for ai_id in ai_ids
+        },
+        "table": {
+            ai_id: {
+                counter: int(get(f"{ai_id}:{counter}")) for counter in COUNTERS
+            }
+            for ai_id in ai_ids
+        },
+        "performance": {
+            ai_id: json.loads(get(f"{ai_id}:performance")) for ai_id in ai_ids
+        },
+    }
+
+
+def get_progress(benchmarking_session_id, ai_ids):
+    """
+    Returns the total amount of cases of a benchmark session along with the
+    progress counters published by each of its executions (a single one
+    unless the session is sharded), in the same shape as the statistics of
+    the reporter, or `(None, [])` if the session has not started yet
+    """
+    fields = {
+        field.decode(): value.decode()
+        for field, value in get_redis()
+        .hgetall(progress_key(benchmarking_session_id))
+        .items()
+    }
+    if "totalCaseCount" not in fields:
+        return None, []
+
+    shard_statistics = [
+        _read_shard_statistics(fields, field.partition(":")[0], ai_ids)
+        for field in fields
+        if field.endswith(":currentCaseIndex")
+    ]
+    return int(fields["totalCaseCount"]), shard_statistics
@@ -0,0 +1,244 @@
+import asyncio
+import glob
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import deque
+
+from aiohttp import web
+from django.conf import settings
+
+from common.definitions import HealthCheckStatus
+
+RECORDINGS_DIR = settings.BENCHMARKING_SESSION_RECORDINGS_DIR
+
+
+def get_recording_path(benchmarking_session_id, case_offset=0):
+    """
+    Returns the file the exchanges of the execution running the cases of a
+    benchmark session from `case_offset` onwards are recorded to
+    """
+    return os.path.join(
+        RECORDINGS_DIR, str(benchmarking_session_id), f"{case_offset}.jsonl"
+    )
+
+
+def get_request_digest(ai_implementation_id, operation, body):
+    """
+    Returns the key a request is replayed by, i.e. the digest of its
+    uncompressed body along with the ai implementation and endpoint
+    """
+    digest = hashlib.sha1(body).hexdigest()
+    return f"{ai_implementation_id}:{operation}:{digest}"
+
+
+class ExchangeRecorder:
+    """
+    Records the HTTP exchanges of an execution of a benchmark session to a
+    json lines file: a header with the pre-flight outcome of the ai
+    implementations, then every attempt of every request with its status
+    code (none if it could not reach the ai implementation), raw response
+    body and timings, e.g.
+    `{"aiImplementationId": ..., "operation": "solve-case", "request": ...,
+      "status": 200, "response": ..., "latency": 0.2, "timings": {...}}`
+
+    An execution resumed later appends to the same file
+    """
+
+    def __init__(self, path, preflight):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.file = open(path, "a")
+        self.write({"preflight": preflight})
+
+    def write(self, entry):
+        self.file.write(json.dumps(entry) + "\n")
+
+    def record(self, request, status_code, content, trace):
+        """Records an attempt of a request that has just finished"""
+        body = request.body
+        if request.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+
+        self.write(
+            {
+                "aiImplementationId": str(request.lane.ai_implementation.id),
+                "operation": request.lane.endpoint.rsplit("/", 1)[-1],
+                "request": body.decode(),
+                "status": status_code,
+                "response": (
+                    None
+                    if content is None
+                    else content.decode(errors="replace")
+                ),
+                "latency": trace.latency,
+                "timings": trace.to_dict()["timings"],
+            }
+        )
+
+    def close(self):
+        self.file.close()
+
+
+def load_recording(benchmarking_session_id):
+    """
+    Returns the pre-flight outcome and the exchanges recorded by all the
+    executions of a benchmark session, raising `FileNotFoundError` if it
+    was not recorded
+    """
+    paths = sorted(
+        glob.glob(
+            os.path.join(
+                RECORDINGS_DIR, str(benchmarking_session_id), "*.jsonl"
+            )
+        )
+    )
+    if not paths:
+        raise FileNotFoundError(
+            f"No recording of benchmark session {benchmarking_session_id}"
+        )
+
+    preflight = {}
+    exchanges = []
+    for path in paths:
+        with open(path) as recording_file:
+            for line in recording_file:
+                entry = json.loads(line)
+                if "preflight" in entry:
+                    preflight.update(entry["preflight"])
+                else:
+                    exchanges.append(entry)
+
+    return preflight, exchanges
+
+
+class ReplayServer:
+    """
+    HTTP server standing in for the ai implementations of a recorded
+    benchmark session, answering every request with the response recorded
+    for the same request, after its recorded latency (or straight away, at
+    max speed), and dropping the connection for requests that could not
+    reach the ai implementation back then
+
+    Each ai implementation is served under `<url>/<ai implementation id>`.
+    Requests recorded several times (retries, hedges) are answered in the
+    recorded order, the last answer being repeated, and those never recorded
+    are answered with a 404 error
+
+    The server runs its own event loop on a background thread, so that it
+    can be requested from the same process
+    """
+
+    ORIGINAL = "original"
+    MAX = "max"
+
+    def __init__(self, preflight, exchanges, speed=ORIGINAL, host="127.0.0.1"):
+        self.preflight = preflight
+        self.speed = speed
+        self.host = host
+        self.exchanges = {}
+        for exchange in exchanges:
+            key = get_request_digest(
+                exchange["aiImplementationId"],
+                exchange["operation"],
+                exchange["request"].encode(),
+            )
+            self.exchanges.setdefault(key, deque()).append(exchange)
+
+        self.url = None
+        self.loop = None
+        self.thread = None
+
+    def make_app(self):
+        app = web.Application(client_max_size=0)
+        app.add_routes(
+            [
+                web.get(
+                    "/{ai_implementation_id}/health-check", self.health_check
+                ),
+                web.post(
+                    "/{ai_implementation_id}/{operation}", self.solve_cases
+                ),
+            ]
+        )
+        return app
+
+    async def health_check(self, request):
+        """Advertises the capabilities found by the recorded pre-flight"""
+        outcome = self.preflight.get(
+            request.match_info["ai_implementation_id"], {}
+        )
+        if outcome.get("status") != HealthCheckStatus.OK.value:
+            return web.json_response({"status": "ERROR"}, status=503)
+
+        capabilities = {}
+        if "maxBatchSize" in outcome:
+            capabilities["solveCases"] = {
+                "maxBatchSize": outcome["maxBatchSize"]
+            }
+        if outcome.get("gzipRequests"):
+            capabilities["contentEncodings"] = ["gzip"]
+        return web.json_response(
+            {"status": "OK", "capabilities": capabilities}
+        )
+
+    async def solve_cases(self, request):
+        """Replays the response recorded for the request"""
+        # gzipped request bodies are decompressed by aiohttp already
+        body = await request.read()
+
+        exchanges = self.exchanges.get(
+            get_request_digest(
+                request.match_info["ai_implementation_id"],
+                request.match_info["operation"],
+                body,
+            )
+        )
+        if not exchanges:
+            return web.json_response(
+                {"error": "No recorded exchange for this request"}, status=404,
+            )
+        exchange = exchanges.popleft() if len(exchanges) > 1 else exchanges[0]
+
+        if self.speed == self.ORIGINAL and exchange["latency"] is not None:
+            await asyncio.sleep(exchange["latency"])
+
+        if exchange["status"] is None:
+            request.transport.close()
+            raise asyncio.CancelledError
+
+        return web.Response(
+            status=exchange["status"],
+            text=exchange["response"],
+            content_type="application/json",
+        )
+
+    def start(self):
+        """Starts serving, returning once the server is listening"""
+        started = threading.Event()
+        self.loop = asyncio.new_event_loop()
+        runner = web.AppRunner(self.make_app(), access_log=None)
+
+        def serve():
+            asyncio.set_event_loop(self.loop)
+            self.loop.run_until_complete(runner.setup())
+            site = web.TCPSite(runner, self.host, 0)
+            self.loop.run_until_complete(site.start())
+            host, port = runner.addresses[0][:2]
+            self.url = f"http://{host}:{port}"
+            started.set()
+
+            self.loop.run_forever()
+            self.loop.run_until_complete(runner.cleanup())
+            self.loop.close()
+
+        self.thread = threading.Thread(target=serve, daemon=True)
+        self.thread.start()
+        started.wait()
+        return self.url
+
+    def stop(self):
+        """Stops serving"""
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
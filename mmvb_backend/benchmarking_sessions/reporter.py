@@ -0,0 +1,380 @@
+import time
+from uuid import UUID
+
+from django.conf import settings
+
+from benchmarking_sessions.models import (
+    BenchmarkingStepError,
+    BenchmarkingStepStatus,
+)
+from benchmarking_sessions.performance import get_performance
+
+
+class BenchmarkReporter:
+    """
+    Helper class to keep track of Benchmark Session execution
+    and report its progress
+    """
+
+    FINISHED_STATUS = {
+        BenchmarkingStepStatus.COMPLETED.value,
+        BenchmarkingStepStatus.ERRORED.value,
+    }
+
+    CHECKPOINT_INTERVAL = settings.BENCHMARKING_SESSION_CHECKPOINT_INTERVAL
+    PROGRESS_INTERVAL = settings.BENCHMARKING_SESSION_PROGRESS_INTERVAL
+    PROGRESS_BATCH_SIZE = settings.BENCHMARKING_SESSION_PROGRESS_BATCH_SIZE
+
+    def __init__(
+        self,
+        ai_implementations,
+        cases,
+        case_offset=0,
+        checkpoint=None,
+        progress=None,
+        step_finished=None,
+    ):
+        self.ai_implementations = ai_implementations
+        self.cases = cases
+        # index of the first case within the whole case set, for sessions
+        # whose cases are split into shards
+        self.case_offset = case_offset
+        # callable persisting the steps finished since the last checkpoint
+        self.checkpoint = checkpoint
+        self.last_checkpoint_time = time.monotonic()
+        self.unsaved_steps = []
+        # callable publishing the progress counters along with the status
+        # changes since the last report, read by the status endpoint
+        self.progress = progress
+        # callable given every finished step (restored ones included) as
+        # `(case id, ai implementation id, response)`
+        self.step_finished = step_finished
+
+        # status changes not yet published as progress
+        self.deltas = []
+        self.last_report_time = time.monotonic()
+
+        # counters of finished steps, kept up to date instead of being
+        # recounted from the responses on every report
+        self.table = {
+            str(ai_implementation.id): {
+                "errors": 0,
+                "timeouts": 0,
+                "completed": 0,
+            }
+            for ai_implementation in ai_implementations
+        }
+        self.finished_ai_counts = [0] * len(cases)
+        self.finished_case_count = 0
+
+        # latencies of the requests answered by each ai implementation and
+        # amount of steps it was requested, since this execution started
+        self.started_at = time.monotonic()
+        self.latencies = {
+            str(ai_implementation.id): []
+            for ai_implementation in ai_implementations
+        }
+        self.requested_step_counts = {
+            str(ai_implementation.id): 0
+            for ai_implementation in ai_implementations
+        }
+
+        # index of the first case not yet finished by each ai implementation
+        self.case_indexes = {
+            str(ai_implementation.id): 0
+            for ai_implementation in ai_implementations
+        }
+
+        self.responses = [
+            {
+                "caseId": str(case.id),
+                "caseIndex": case_offset + case_index,
+                "responses": self.response_template(),
+            }
+            for case_index, case in enumerate(cases)
+        ]
+
+    def response_template(self):
+        """
+        Returns the template data structure for a case response for
+        the ai implementations
+        """
+        template = {}
+
+        for ai_implementation in self.ai_implementations:
+            template[str(ai_implementation.id)] = {
+                "status": BenchmarkingStepStatus.PENDING.value
+            }
+
+        return template
+
+    def restore(self, stored_responses):
+        """
+        Takes over the finished responses of a previous execution of the
+        benchmark session, so that those are not requested again, and
+        informs whether there was any
+        """
+        stored_responses_by_case_id = {
+            case_responses["caseId"]: case_responses["responses"]
+            for case_responses in stored_responses or []
+        }
+
+        for case_responses in self.responses:
+            stored_case_responses = stored_responses_by_case_id.get(
+                case_responses["caseId"], {}
+            )
+            for ai_implementation_id, response in case_responses[
+                "responses"
+            ].items():
+                stored_response = stored_case_responses.get(
+                    ai_implementation_id, {}
+                )
+                if stored_response.get("status") in self.FINISHED_STATUS:
+                    response.update(stored_response)
+                    self._count_finished_step(
+                        case_responses["caseIndex"] - self.case_offset,
+                        ai_implementation_id,
+                        response,
+                    )
+
+        for ai_implementation_id in self.case_indexes:
+            self._advance_case_index(ai_implementation_id)
+
+        return any(self.finished_ai_counts)
+
+    def pending_case_indexes(self, ai_implementation_id: UUID):
+        """Returns the indexes of the cases not yet finished by an ai"""
+        ai_implementation_id = str(ai_implementation_id)
+        return [
+            case_index
+            for case_index, case_responses in enumerate(self.responses)
+            if case_responses["responses"][ai_implementation_id]["status"]
+            not in self.FINISHED_STATUS
+        ]
+
+    def save_checkpoint(self):
+        """
+        Persists the steps finished since the last checkpoint, if a
+        checkpoint is set
+        """
+        self.last_checkpoint_time = time.monotonic()
+        if self.checkpoint is None or not self.unsaved_steps:
+            return
+
+        steps = []
+        for case_index, ai_implementation_id in self.unsaved_steps:
+            case_responses = self.responses[case_index]
+            step = {
+                "caseId": case_responses["caseId"],
+                "caseIndex": case_responses["caseIndex"],
+                "aiImplementationId": ai_implementation_id,
+            }
+            step.update(case_responses["responses"][ai_implementation_id])
+            steps.append(step)
+
+        self.checkpoint(steps)
+        self.unsaved_steps = []
+
+    def statistics(self):
+        """Returns the compact counters describing the progress so far"""
+        return {
+            "currentCaseIndex": self.case_index,
+            "totalCaseCount": len(self.cases),
+            "finishedCaseCount": self.finished_case_count,
+            "aiCaseIndexes": self.case_indexes,
+            "table": self.table,
+            "performance": self.performance(),
+        }
+
+    def performance(self):
+        """
+        Returns the latency percentiles and throughput of each ai
+        implementation for the steps requested by this execution
+        """
+        duration = time.monotonic() - self.started_at
+        return {
+            ai_implementation_id: get_performance(
+                latencies,
+                self.requested_step_counts[ai_implementation_id],
+                duration,
+            )
+            for ai_implementation_id, latencies in self.latencies.items()
+        }
+
+    def report(self, force=False):
+        """
+        Publishes the status changes since the last report along with the
+        current counters, coalescing changes until either enough of them
+        are pending or enough time has passed since the last report
+        """
+        if not force and (
+            len(self.deltas) < self.PROGRESS_BATCH_SIZE
+            and time.monotonic() - self.last_report_time
+            < self.PROGRESS_INTERVAL
+        ):
+            return
+
+        if self.progress is not None:
+            self.progress(self.statistics(), self.deltas)
+
+        self.deltas = []
+        self.last_report_time = time.monotonic()
+
+    @property
+    def case_index(self):
+        """Index of the first case not yet finished by all ai implementations"""
+        return self.case_offset + min(
+            self.case_indexes.values(), default=len(self.cases)
+        )
+
+    def _advance_case_index(self, ai_implementation_id: str):
+        """
+        Moves the case index of an ai implementation past all the cases it
+        has already finished, as those may complete out of order
+        """
+        case_index = self.case_indexes[ai_implementation_id]
+        while (
+            case_index < len(self.responses)
+            and self.responses[case_index]["responses"][ai_implementation_id][
+                "status"
+            ]
+            in self.FINISHED_STATUS
+        ):
+            case_index += 1
+        self.case_indexes[ai_implementation_id] = case_index
+
+    def _count_finished_step(
+        self, case_index: int, ai_implementation_id: str, response: dict
+    ):
+        """Updates the counters with a step that has just finished"""
+        counters = self.table[ai_implementation_id]
+        if response["status"] == BenchmarkingStepStatus.COMPLETED.value:
+            counters["completed"] += 1
+        elif response.get("error") == BenchmarkingStepError.TIMEOUT.value:
+            counters["timeouts"] += 1
+        else:
+            counters["errors"] += 1
+
+        self.finished_ai_counts[case_index] += 1
+        if self.finished_ai_counts[case_index] == len(self.table):
+            self.finished_case_count += 1
+
+        if self.step_finished is not None:
+            self.step_finished(
+                self.responses[case_index]["caseId"],
+                ai_implementation_id,
+                response,
+            )
+
+    def _update_case_status(
+        self,
+        case_index: int,
+        ai_implementation_id: UUID,
+        status: BenchmarkingStepStatus,
+        error: BenchmarkingStepError = None,
+        error_reason: str = None,
+    ):
+        """Updates the status for a given ai implementation and case"""
+        ai_implementation_id = str(ai_implementation_id)
+        response = self.responses[case_index]["responses"][
+            ai_implementation_id
+        ]
+        response["status"] = status.value
+        if error is not None:
+            response["error"] = error.value
+        if error_reason is not None:
+            response["errorReason"] = error_reason
+
+        delta = {
+            "caseIndex": self.case_offset + case_index,
+            "aiImplementationId": ai_implementation_id,
+            "status": status.value,
+        }
+        if error is not None:
+            delta["error"] = error.value
+        self.deltas.append(delta)
+
+        if status.value in self.FINISHED_STATUS:
+            self._count_finished_step(
+                case_index, ai_implementation_id, response
+            )
+            self._advance_case_index(ai_implementation_id)
+            self.unsaved_steps.append((case_index, ai_implementation_id))
+            if (
+                time.monotonic() - self.last_checkpoint_time
+                >= self.CHECKPOINT_INTERVAL
+            ):
+                self.save_checkpoint()
+
+        self.report()
+
+    def trace(self, case_index: int, ai_implementation_id: UUID, trace: dict):
+        """
+        Records the timings and sizes of the request sent for a given case
+        to an ai implementation, before its outcome is reported
+        """
+        ai_implementation_id = str(ai_implementation_id)
+        self.responses[case_index]["responses"][ai_implementation_id][
+            "trace"
+        ] = trace
+        self.requested_step_counts[ai_implementation_id] += 1
+
+        timings = trace["timings"]
+        if "sent" in timings and "firstByte" in timings:
+            self.latencies[ai_implementation_id].append(
+                timings["completed"] - timings["sent"]
+            )
+
+    def processing(self, case_index: int, ai_implementation_id: UUID):
+        """
+        Helper method for updating status of ai implementation as PROCESSING
+        for a given case
+        """
+        self._update_case_status(
+            case_index, ai_implementation_id, BenchmarkingStepStatus.PROCESSING
+        )
+
+    def completed(
+        self, case_index: int, ai_implementation_id: UUID, response: dict
+    ):
+        """
+        Helper method for updating status of ai implementation as COMPLETED
+        for a given case
+        """
+        self.responses[case_index]["responses"][str(ai_implementation_id)][
+            "value"
+        ] = response
+        self._update_case_status(
+            case_index, ai_implementation_id, BenchmarkingStepStatus.COMPLETED
+        )
+
+    def cached(
+        self, case_index: int, ai_implementation_id: UUID, response: dict
+    ):
+        """
+        Helper method for updating status of ai implementation as COMPLETED
+        for a given case with a response served from the cache
+        """
+        self.responses[case_index]["responses"][str(ai_implementation_id)][
+            "cached"
+        ] = True
+        self.completed(case_index, ai_implementation_id, response)
+
+    def error(
+        self,
+        case_index: int,
+        ai_implementation_id: UUID,
+        error: BenchmarkingStepError,
+        error_reason: str = None,
+    ):
+        """
+        Helper method for updating status of ai implementation as ERRORED
+        for a given case, along with the reason of the error if known
+        """
+        self._update_case_status(
+            case_index,
+            ai_implementation_id,
+            BenchmarkingStepStatus.ERRORED,
+            error,
+            error_reason,
+        )
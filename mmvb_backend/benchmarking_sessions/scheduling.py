@@ -0,0 +1,80 @@
+import time
+
+from django.conf import settings
+
+from benchmarking_sessions.models import BenchmarkingSession
+from benchmarking_sessions.progress import get_redis
+
+CAPACITY = settings.BENCHMARKING_SESSION_CAPACITY
+
+# relative share of the capacity of each priority class
+PRIORITY_WEIGHTS = {
+    BenchmarkingSession.Priority.INTERACTIVE: 4,
+    BenchmarkingSession.Priority.NORMAL: 2,
+    BenchmarkingSession.Priority.BATCH: 1,
+}
+
+# registry of the running executions, scored by their latest heartbeat
+EXECUTIONS_KEY = "benchmarking-sessions:executions"
+
+
+class FairShare:
+    """
+    Splits the capacity (requests in flight to each ai implementation)
+    between the executions of all running benchmark sessions, as weighted
+    fair sharing: each session gets a share proportional to the weight of
+    its priority class, which is split evenly between its shards
+
+    Executions announce themselves with a heartbeat every time their share
+    is asked for, those not heard of for a while being considered gone
+    """
+
+    # seconds without heartbeat after which an execution is considered gone
+    STALE_AFTER = 60
+
+    def __init__(
+        self, benchmarking_session_id, priority, case_offset=0, capacity=None
+    ):
+        self.benchmarking_session_id = str(benchmarking_session_id)
+        self.weight = PRIORITY_WEIGHTS[priority]
+        self.capacity = CAPACITY if capacity is None else capacity
+        self.member = (
+            f"{self.benchmarking_session_id}:{case_offset}:{self.weight}"
+        )
+
+    def register(self):
+        """Announces the execution as running"""
+        get_redis().zadd(EXECUTIONS_KEY, {self.member: time.time()})
+
+    def unregister(self):
+        """Withdraws the execution, whose share goes to the others"""
+        get_redis().zrem(EXECUTIONS_KEY, self.member)
+
+    def __call__(self):
+        """
+        Returns the amount of requests in flight the execution is allowed
+        to each ai implementation, at least one
+        """
+        now = time.time()
+        pipeline = get_redis().pipeline()
+        pipeline.zadd(EXECUTIONS_KEY, {self.member: now})
+        pipeline.zremrangebyscore(EXECUTIONS_KEY, 0, now - self.STALE_AFTER)
+        pipeline.zrange(EXECUTIONS_KEY, 0, -1)
+        members = pipeline.execute()[-1]
+
+        session_weights = {}
+        execution_counts = {}
+        for member in members:
+            session_id, _, weight = member.decode().split(":")
+            session_weights[session_id] = int(weight)
+            execution_counts[session_id] = (
+                execution_counts.get(session_id, 0) + 1
+            )
+
+        share = (
+            self.capacity
+            * self.weight
+            / sum(session_weights.values())
+            / execution_counts[self.benchmarking_session_id]
+        )
+        return max(1, int(share))
@@ -1,212 +1,624 @@
-from concurrent.futures import as_completed
-from json.decoder import JSONDecodeError
-from posixpath import join as urljoin
-from uuid import UUID
+import random
+from functools import partial
 
-from celery import shared_task
+from celery import chord, group, shared_task
+from celery.exceptions import Ignore
 from django.conf import settings
-from requests import ConnectionError, ReadTimeout
-from requests_futures.sessions import FuturesSession
-
+from django.db.models import F
+from django.utils import timezone
+
+from benchmarking_sessions.cache import ResponseCache, evict_cached_responses
+from benchmarking_sessions.early_stopping import RankingMonitor
+from benchmarking_sessions.engines import SUPPORTED_ENGINES
+from benchmarking_sessions.estimates import estimate_runtime
+from benchmarking_sessions.load_test import run_load_test
 from benchmarking_sessions.models import (
+    BenchmarkingResponse,
     BenchmarkingSession,
     BenchmarkingStepError,
     BenchmarkingStepStatus,
 )
-from common.definitions import TRIAGE_OPTIONS
+from benchmarking_sessions.preflight import run_preflight
+from benchmarking_sessions.progress import (
+    clear_progress,
+    is_cancelled,
+    publish_progress,
+    reset_progress,
+)
+from benchmarking_sessions.recording import (
+    ExchangeRecorder,
+    get_recording_path,
+)
+from benchmarking_sessions.reporter import BenchmarkReporter
+from benchmarking_sessions.scheduling import FairShare
+from common.definitions import HealthCheckStatus
 
-TIMEOUT = settings.BENCHMARKING_SESSION_TIMEOUT
+CHECKPOINT_BATCH_SIZE = settings.BENCHMARKING_SESSION_CHECKPOINT_BATCH_SIZE
+BATCH_SIZE = settings.BENCHMARKING_SESSION_BATCH_SIZE
+MAX_RETRIES = settings.BENCHMARKING_SESSION_MAX_RETRIES
 
 
-class BenchmarkReporter:
+def save_checkpoint(benchmarking_session_id, steps, response_cache=None):
     """
-    Helper class to keep track of Benchmark Session execution
-    and report its progress
+    Persists the given finished steps of a benchmark session, caching their
+    responses if a response cache is given
     """
+    BenchmarkingResponse.objects.bulk_create(
+        [
+            BenchmarkingResponse(
+                benchmarking_session_id=benchmarking_session_id,
+                case_id=step["caseId"],
+                ai_implementation_id=step["aiImplementationId"],
+                case_index=step["caseIndex"],
+                status=step["status"],
+                error=step.get("error"),
+                error_reason=step.get("errorReason"),
+                value=step.get("value"),
+                timings=step.get("trace", {}).get("timings"),
+                request_size=step.get("trace", {}).get("requestSize"),
+                response_size=step.get("trace", {}).get("responseSize"),
+                retry_count=step.get("trace", {}).get("retries", 0),
+                hedge_count=step.get("trace", {}).get("hedges", 0),
+                cached=step.get("cached", False),
+            )
+            for step in steps
+        ],
+        batch_size=CHECKPOINT_BATCH_SIZE,
+        # steps persisted by an interrupted execution are kept as they are
+        ignore_conflicts=True,
+    )
 
-    def __init__(self, ai_implementations, cases, update_state):
-        self.ai_implementations = ai_implementations
-        self.cases = cases
-        self.update_state = update_state
-        self.case_index = None
+    if response_cache is not None:
+        response_cache.store(steps)
 
-        self.responses = [
-            {
-                "caseId": str(case.id),
-                "caseIndex": case_index,
-                "responses": self.response_template(),
-            }
-            for case_index, case in enumerate(cases)
-        ]
 
-    def response_template(self):
-        """
-        Returns the template data structure for a case response for
-        the ai implementations
-        """
-        template = {}
-
-        for ai_implementation in self.ai_implementations:
-            template[str(ai_implementation.id)] = {
-                "status": BenchmarkingStepStatus.PENDING.value
-            }
-
-        return template
-
-    def mark_begin_case(self, case_index):
-        """Updates the index tracking with the case currently being benchmarked"""
-        self.case_index = case_index
-
-    def _update_case_status(
-        self,
-        ai_implementation_id: UUID,
-        status: BenchmarkingStepStatus,
-        error: BenchmarkingStepError = None,
-    ):
-        """
-        Updates the status for a given ai implementation for case currently
-        being benchmarked
-        """
-        response = self.responses[self.case_index]["responses"][
-            str(ai_implementation_id)
-        ]
-        response["status"] = status.value
-        if error is not None:
-            response["error"] = error.value
-
-        report = {
-            "responses": self.responses,
-            "statistics": {
-                "currentCaseIndex": self.case_index,
-                "totalCaseCount": len(self.cases),
-            },
-        }
-        self.update_state(status="PROCESSING", meta=report)
-
-    def processing(self, ai_implementation_id: UUID):
-        """
-        Helper method for updating status of ai implementation as PROCESSING
-        for case currently being benchmarked
-        """
-        self._update_case_status(
-            ai_implementation_id, BenchmarkingStepStatus.PROCESSING
+def copy_derived_responses(benchmarking_session):
+    """
+    Copies the completed responses of the session a benchmark session was
+    derived from for the pairs of case and ai implementation of the session
+    that are unchanged since, i.e. neither the case nor the ai
+    implementation were modified after the response was received
+
+    Copied responses are kept as reused, without timings, so that they count
+    towards the results and metrics of the session but not its performance
+    """
+    derived_from = benchmarking_session.derived_from
+    if derived_from is None:
+        return
+
+    case_indexes = {
+        case_id: case_index
+        for case_index, case_id in enumerate(
+            benchmarking_session.get_cases().values_list("id", flat=True)
         )
+    }
+    responses = derived_from.benchmarking_responses.filter(
+        status=BenchmarkingStepStatus.COMPLETED.value,
+        case__case_sets=benchmarking_session.case_set_id,
+        ai_implementation__in=benchmarking_session.ai_implementations.all(),
+        created_on__gte=F("case__modified_on"),
+    ).filter(created_on__gte=F("ai_implementation__modified_on"))
+
+    BenchmarkingResponse.objects.bulk_create(
+        [
+            BenchmarkingResponse(
+                benchmarking_session_id=benchmarking_session.id,
+                case_id=case_id,
+                ai_implementation_id=ai_implementation_id,
+                case_index=case_indexes[case_id],
+                status=BenchmarkingStepStatus.COMPLETED.value,
+                value=value,
+                timings=None,
+                cached=True,
+            )
+            for case_id, ai_implementation_id, value in responses.values_list(
+                "case_id", "ai_implementation_id", "value"
+            ).iterator()
+        ],
+        batch_size=CHECKPOINT_BATCH_SIZE,
+        # responses copied by a previous execution are kept as they are
+        ignore_conflicts=True,
+    )
+
 
-    def completed(self, ai_implementation_id: UUID, response: dict):
-        """
-        Helper method for updating status of ai implementation as COMPLETED
-        for case currently being benchmarked
-        """
-        self._update_case_status(
-            ai_implementation_id, BenchmarkingStepStatus.COMPLETED
+def execute_benchmark(
+    benchmarking_session, cases, case_offset=0, ranking_monitor=None,
+):
+    """
+    Sends the given cases to the ai implementations of a benchmark session
+    using the engine selected for the session and returns its reporter
+    along with the engine, whose `stopped` tells whether it stopped early
+
+    Responses are checkpointed while running and the steps already finished
+    by a previous execution of the session are not requested again. Every
+    finished step is handed to the ranking monitor, if given, the execution
+    stopping once it tells the ranking is settled
+    """
+    ai_implementations = list(benchmarking_session.ai_implementations.all())
+    response_cache = (
+        ResponseCache(ai_implementations, cases)
+        if benchmarking_session.use_cache
+        else None
+    )
+    reporter = BenchmarkReporter(
+        ai_implementations,
+        cases,
+        case_offset=case_offset,
+        checkpoint=partial(
+            save_checkpoint,
+            benchmarking_session.id,
+            response_cache=response_cache,
+        ),
+        progress=partial(
+            publish_progress, benchmarking_session.id, case_offset=case_offset
+        ),
+        step_finished=(
+            None if ranking_monitor is None else ranking_monitor.record
+        ),
+    )
+    # only the responses of the given cases are resumed from, along with
+    # their values if they are to be ranked
+    resumed = reporter.restore(
+        benchmarking_session.get_stored_responses(
+            [case.id for case in cases],
+            with_values=ranking_monitor is not None,
         )
-        self.responses[self.case_index]["responses"][
-            str(ai_implementation_id)
-        ]["value"] = response
-
-    def error(self, ai_implementation_id: UUID, error: BenchmarkingStepError):
-        """
-        Helper method for updating status of ai implementation as ERRORED
-        for case currently being benchmarked
-        """
-        self._update_case_status(
-            ai_implementation_id, BenchmarkingStepStatus.ERRORED, error
+    )
+
+    # ai implementations that failed the pre-flight are not requested
+    preflight = benchmarking_session.preflight or {}
+    available_ai_implementations = []
+    for ai_implementation in ai_implementations:
+        outcome = preflight.get(str(ai_implementation.id), {})
+        if outcome.get("status", HealthCheckStatus.OK.value) == (
+            HealthCheckStatus.OK.value
+        ):
+            available_ai_implementations.append(ai_implementation)
+            continue
+
+        for case_index in reporter.pending_case_indexes(ai_implementation.id):
+            reporter.error(
+                case_index,
+                ai_implementation.id,
+                BenchmarkingStepError.UNAVAILABLE,
+            )
+
+    # cached responses are served without requesting the ai implementations
+    if response_cache is not None:
+        for ai_implementation in available_ai_implementations:
+            pending_case_indexes = reporter.pending_case_indexes(
+                ai_implementation.id
+            )
+            cached_responses = response_cache.lookup(
+                ai_implementation.id,
+                [cases[case_index].id for case_index in pending_case_indexes],
+            )
+            for case_index in pending_case_indexes:
+                cached_response = cached_responses.get(
+                    str(cases[case_index].id)
+                )
+                if cached_response is not None:
+                    reporter.cached(
+                        case_index, ai_implementation.id, cached_response
+                    )
+
+    # cases are sent in batches to the ai implementations supporting it, up
+    # to the batch size of the session
+    session_batch_size = benchmarking_session.batch_size or BATCH_SIZE
+    batch_sizes = {}
+    if session_batch_size > 1:
+        batch_sizes = {
+            ai_implementation_id: min(
+                outcome["maxBatchSize"], session_batch_size
+            )
+            for ai_implementation_id, outcome in preflight.items()
+            if "maxBatchSize" in outcome
+        }
+
+    # request bodies are compressed for the ai implementations accepting it
+    gzip_requests = {
+        ai_implementation_id
+        for ai_implementation_id, outcome in preflight.items()
+        if outcome.get("gzipRequests")
+    }
+
+    # the deadline counts from when the session started running, shards
+    # included, unless the execution resumes the steps finished by a
+    # previous one (e.g. a shard picked up again after its worker was lost)
+    deadline = benchmarking_session.get_deadline(
+        resumed_on=timezone.now() if resumed else None
+    )
+
+    # exchanges are recorded to a file of their own for each execution
+    recorder = None
+    if benchmarking_session.record_exchanges:
+        recorder = ExchangeRecorder(
+            get_recording_path(benchmarking_session.id, case_offset),
+            preflight,
+        )
+
+    # the capacity is shared with the other running sessions
+    window_share = FairShare(
+        benchmarking_session.id,
+        benchmarking_session.priority,
+        case_offset=case_offset,
+    )
+
+    engine_class = SUPPORTED_ENGINES[benchmarking_session.engine]
+    engine = engine_class(
+        cases,
+        available_ai_implementations,
+        reporter,
+        batch_sizes=batch_sizes,
+        gzip_requests=gzip_requests,
+        max_retries=(
+            MAX_RETRIES
+            if benchmarking_session.max_retries is None
+            else benchmarking_session.max_retries
+        ),
+        hedging=benchmarking_session.hedged_requests,
+        deadline=deadline,
+        is_cancelled=partial(is_cancelled, benchmarking_session.id),
+        window_share=window_share,
+        base_urls=benchmarking_session.get_base_urls(),
+        recorder=recorder,
+        is_settled=(
+            None if ranking_monitor is None else ranking_monitor.is_settled
+        ),
+    )
+    window_share.register()
+    try:
+        engine.run()
+    finally:
+        window_share.unregister()
+        if recorder is not None:
+            recorder.close()
+    reporter.save_checkpoint()
+    reporter.report(force=True)
+
+    return reporter, engine
+
+
+def execute_load_test(benchmarking_session):
+    """
+    Runs a load test session against its single ai implementation, which is
+    health checked first, saving the capacity curve after every step
+    """
+    ai_implementations = list(benchmarking_session.ai_implementations.all())
+    benchmarking_session.preflight = run_preflight(ai_implementations)
+    benchmarking_session.capacity_curve = []
+    benchmarking_session.save(update_fields=["preflight", "capacity_curve"])
+
+    cases = list(benchmarking_session.get_raw_cases())
+
+    def save_capacity_curve(capacity_curve):
+        benchmarking_session.capacity_curve = capacity_curve
+        benchmarking_session.save(update_fields=["capacity_curve"])
+
+    stopped = None
+    outcome = benchmarking_session.preflight.get(
+        str(ai_implementations[0].id), {}
+    )
+    if cases and outcome.get("status", HealthCheckStatus.OK.value) == (
+        HealthCheckStatus.OK.value
+    ):
+        _, stopped = run_load_test(
+            benchmarking_session,
+            SUPPORTED_ENGINES[benchmarking_session.engine],
+            cases,
+            gzip_requests=(
+                {str(ai_implementations[0].id)}
+                if outcome.get("gzipRequests")
+                else None
+            ),
+            deadline=benchmarking_session.get_deadline(),
+            is_cancelled=partial(is_cancelled, benchmarking_session.id),
+            on_step=save_capacity_curve,
         )
 
+    benchmarking_session.status = get_final_status([stopped])
+    benchmarking_session.save(update_fields=["status"])
+    clear_progress(benchmarking_session.id)
+
+
+def start_session(benchmarking_session, total_case_count):
+    """
+    Marks a benchmark session as running and informs whether it was, i.e.
+    unless it was cancelled since it was queued
+
+    Its progress is reset beforehand, so that the cancellation flag set
+    from then on is never lost, and its status is only updated from queued
+    (or running, for sessions picked up again after their worker was lost)
+    as the cancel endpoint may be updating it meanwhile
+    """
+    reset_progress(benchmarking_session.id, total_case_count)
+    started_count = BenchmarkingSession.objects.filter(
+        id=benchmarking_session.id,
+        status__in=[
+            BenchmarkingSession.Status.CREATED,
+            BenchmarkingSession.Status.RUNNING,
+        ],
+    ).update(
+        status=BenchmarkingSession.Status.RUNNING,
+        started_on=benchmarking_session.started_on,
+    )
+    if not started_count:
+        clear_progress(benchmarking_session.id)
+        return False
+
+    benchmarking_session.status = BenchmarkingSession.Status.RUNNING
+    return True
 
-@shared_task(bind=True)
+
+def has_live_task(benchmarking_session):
+    """
+    Informs whether a worker is running (or holding) a task of a benchmark
+    session, i.e. its own or one of its shards, which a running session
+    whose worker was lost has none of
+    """
+    task_ids = {
+        benchmarking_session.task_id,
+        *(benchmarking_session.shard_task_ids or []),
+    }
+    inspect = run_benchmark.app.control.inspect()
+    for worker_tasks in (inspect.active(), inspect.reserved()):
+        for tasks in (worker_tasks or {}).values():
+            if any(task["id"] in task_ids for task in tasks):
+                return True
+    return False
+
+
+def was_cancelled(benchmarking_session):
+    """
+    Informs whether a running benchmark session was cancelled, through the
+    flag of its progress or its stored status
+    """
+    return (
+        is_cancelled(benchmarking_session.id)
+        or BenchmarkingSession.objects.filter(
+            id=benchmarking_session.id,
+            status=BenchmarkingSession.Status.CANCELLED,
+        ).exists()
+    )
+
+
+def get_final_status(stop_reasons):
+    """
+    Returns the status of a benchmark session whose executions stopped for
+    the given reasons (none for those that solved all of their cases)
+    """
+    if BenchmarkingSession.Status.CANCELLED in stop_reasons:
+        return BenchmarkingSession.Status.CANCELLED
+    if BenchmarkingSession.Status.TIMED_OUT in stop_reasons:
+        return BenchmarkingSession.Status.TIMED_OUT
+    if BenchmarkingSession.Status.SETTLED in stop_reasons:
+        return BenchmarkingSession.Status.SETTLED
+    return BenchmarkingSession.Status.FINISHED
+
+
+def merge_engine_statistics(shard_engine_statistics):
+    """
+    Merges the engine statistics of the shards of a benchmark session, which
+    ran concurrently: the figures of an ai implementation (e.g. its
+    concurrency) are the sum of its figures on every shard
+    """
+    merged_statistics = {}
+    for engine_statistics in shard_engine_statistics:
+        for statistic, ai_figures in engine_statistics.items():
+            merged_ai_figures = merged_statistics.setdefault(statistic, {})
+            for ai_implementation_id, figures in ai_figures.items():
+                merged_figures = merged_ai_figures.setdefault(
+                    ai_implementation_id, {}
+                )
+                for figure, value in figures.items():
+                    merged_figures[figure] = (
+                        merged_figures.get(figure, 0) + value
+                    )
+
+    return merged_statistics
+
+
+# tasks are only acknowledged once finished, so that they are picked up
+# again (and resumed from their last checkpoint) if their worker is lost
+@shared_task(bind=True, acks_late=True, reject_on_worker_lost=True)
 def run_benchmark(self, benchmarking_session_id):
     """
     Task implementation for actually running the benchmark session
     asynchronously
+
+    Sessions with a shard size smaller than their case set are split into
+    shards that are run by as many workers as available, the session being
+    finished once all of them are
+
+    Running a session again resumes it, skipping every case and ai
+    implementation pair already finished, its deadline counting from then
+
+    Load test sessions are run on their own, as they record no responses,
+    while sessions derived from a finished one only request the pairs of
+    case and ai implementation that were not completed by it, and sessions
+    with early stopping stop as soon as the ranking of their ai
+    implementations is settled
     """
     benchmarking_session = BenchmarkingSession.objects.get(
         id=benchmarking_session_id
     )
 
-    benchmarking_session.status = BenchmarkingSession.Status.RUNNING
-    benchmarking_session.save(update_fields=["status"])
+    # sessions cancelled while queued are never run, even if their task
+    # was not revoked in time, nor are those queued again since (e.g. once
+    # their worker was lost) when their previous task is redelivered
+    if (
+        benchmarking_session.status == BenchmarkingSession.Status.CANCELLED
+        or (
+            benchmarking_session.task_id
+            and benchmarking_session.task_id != self.request.id
+        )
+    ):
+        return
+
+    # the deadline counts from then, sessions picked up again after their
+    # worker was lost included
+    benchmarking_session.started_on = timezone.now()
+
+    # the session is marked running before anything slow, so that it can
+    # be cancelled through its progress flag from then on
+    cases = benchmarking_session.get_raw_cases()
+    case_count = cases.count()
+    if not start_session(benchmarking_session, case_count):
+        return
+
+    if benchmarking_session.kind == BenchmarkingSession.Kind.LOAD_TEST:
+        execute_load_test(benchmarking_session)
+        return
+
+    # pairs unchanged since the session it was derived from are not requested
+    copy_derived_responses(benchmarking_session)
+
+    # the runtime estimate is kept for refining the eta while running
+    benchmarking_session.estimate = estimate_runtime(benchmarking_session)
+
+    # all ai implementations are health checked at once before any case is
+    # sent, shards relying on the recorded outcome
+    benchmarking_session.shard_task_ids = None
+    benchmarking_session.preflight = run_preflight(
+        list(benchmarking_session.ai_implementations.all()),
+        base_urls=benchmarking_session.get_base_urls(),
+    )
+    benchmarking_session.save(
+        update_fields=["shard_task_ids", "preflight", "estimate"]
+    )
 
-    case_set = benchmarking_session.case_set
-    cases = case_set.cases.all()
+    # sessions cancelled while being prepared stop before sending any case
+    if was_cancelled(benchmarking_session):
+        benchmarking_session.status = BenchmarkingSession.Status.CANCELLED
+        benchmarking_session.save(update_fields=["status"])
+        clear_progress(benchmarking_session_id)
+        return
+
+    shard_size = benchmarking_session.shard_size
+
+    # sessions with early stopping go through their cases in a random order
+    # (the same for all of their ai implementations and executions, which
+    # the case indexes of their steps follow), and are never sharded as a
+    # single execution is to decide when to stop
+    ranking_monitor = None
+    if benchmarking_session.early_stopping_metric:
+        ranking_monitor = RankingMonitor.for_session(benchmarking_session)
+        cases = list(cases)
+        random.Random(str(benchmarking_session.id)).shuffle(cases)
+        shard_size = None
+
+    if shard_size and case_count > shard_size:
+        shards = [
+            run_benchmark_shard.s(
+                benchmarking_session_id,
+                first_case_index,
+                min(first_case_index + shard_size, case_count),
+            ).set(queue=benchmarking_session.queue)
+            for first_case_index in range(0, case_count, shard_size)
+        ]
+
+        # freezing assigns the task ids before the shards are sent, so that
+        # they can be followed from the start
+        benchmarking_session.shard_task_ids = [
+            shard.freeze().id for shard in shards
+        ]
+        benchmarking_session.save(update_fields=["shard_task_ids"])
+
+        # shards are run from the queue of the priority class of the session,
+        # which is marked as errored instead of merged if any of them fails
+        chord(group(shards))(
+            merge_benchmark_shards.s(benchmarking_session_id)
+            .set(queue=benchmarking_session.queue)
+            .on_error(
+                fail_benchmark_session.si(benchmarking_session_id).set(
+                    queue=benchmarking_session.queue
+                )
+            )
+        )
+        return
+
+    try:
+        _, engine = execute_benchmark(
+            benchmarking_session, list(cases), ranking_monitor=ranking_monitor,
+        )
+    except Exception:
+        fail_benchmark_session(benchmarking_session_id)
+        raise
+
+    benchmarking_session.statistics = engine.statistics()
+    if ranking_monitor is not None:
+        benchmarking_session.statistics[
+            "earlyStopping"
+        ] = ranking_monitor.statistics()
+    benchmarking_session.status = get_final_status([engine.stopped])
+    benchmarking_session.save(update_fields=["status", "statistics"])
+    clear_progress(benchmarking_session_id)
+
+    if benchmarking_session.use_cache:
+        evict_cached_responses()
+
+
+@shared_task(bind=True, acks_late=True, reject_on_worker_lost=True)
+def run_benchmark_shard(
+    self, benchmarking_session_id, first_case_index, last_case_index
+):
+    """
+    Task implementation for running the cases of a benchmark session from
+    `first_case_index` up to (not including) `last_case_index`
+    """
+    benchmarking_session = BenchmarkingSession.objects.get(
+        id=benchmarking_session_id
+    )
+
+    # shards of a previous execution of a session run again since are
+    # ignored when redelivered, leaving their chord unfinished
+    if self.request.id not in (benchmarking_session.shard_task_ids or []):
+        raise Ignore()
 
-    ai_implementations = benchmarking_session.ai_implementations.all()
-    reporter = BenchmarkReporter(ai_implementations, cases, self.update_state)
+    cases = benchmarking_session.get_raw_cases()
+    _, engine = execute_benchmark(
+        benchmarking_session,
+        list(cases[first_case_index:last_case_index]),
+        case_offset=first_case_index,
+    )
+    return {
+        "engineStatistics": engine.statistics(),
+        "stopped": engine.stopped,
+    }
 
-    session = FuturesSession(max_workers=len(ai_implementations))
 
-    for case_index, case in enumerate(cases):
-        reporter.mark_begin_case(case_index)
+@shared_task
+def merge_benchmark_shards(shard_reports, benchmarking_session_id):
+    """
+    Task implementation for finishing a sharded benchmark session once all
+    of its shards are finished (or stopped early), their responses being
+    already persisted
+    """
+    benchmarking_session = BenchmarkingSession.objects.get(
+        id=benchmarking_session_id
+    )
 
-        for ai_implementation in ai_implementations:
-            # todo: do health-check
-            pass
+    benchmarking_session.statistics = merge_engine_statistics(
+        shard_report["engineStatistics"] for shard_report in shard_reports
+    )
+    benchmarking_session.status = get_final_status(
+        [shard_report["stopped"] for shard_report in shard_reports]
+    )
+    benchmarking_session.save(update_fields=["status", "statistics"])
+    clear_progress(benchmarking_session_id)
 
-        request_futures = []
-        request_ai_implementation_map = {}
+    if benchmarking_session.use_cache:
+        evict_cached_responses()
 
-        for ai_implementation in ai_implementations:
-            reporter.processing(ai_implementation.id)
 
-            ai_endpoint = urljoin(ai_implementation.base_url, "solve-case")
-            request = session.post(
-                ai_endpoint,
-                json={
-                    "caseData": case.data["caseData"],
-                    "aiImplementation": ai_implementation.name,
-                },
-                timeout=TIMEOUT,
-            )
-            request_futures.append(request)
-            request_ai_implementation_map[request] = ai_implementation
-
-        # wait for all to complete
-        for request in as_completed(request_futures):
-            ai_implementation = request_ai_implementation_map[request]
-            request_exception = request.exception(timeout=0)
-            if isinstance(request_exception, ConnectionError):
-                reporter.error(
-                    ai_implementation.id, BenchmarkingStepError.TIMEOUT,
-                )
-            elif isinstance(request_exception, ReadTimeout):
-                reporter.error(
-                    ai_implementation.id, BenchmarkingStepError.TIMEOUT,
-                )
-            else:
-                response = request.result(timeout=0)
-                try:
-                    ai_response = response.json()
-                except JSONDecodeError:
-                    reporter.error(
-                        ai_implementation.id,
-                        BenchmarkingStepError.SERVER_ERROR,
-                    )
-                else:
-                    if not response.ok:
-                        reporter.error(
-                            ai_implementation.id,
-                            BenchmarkingStepError.SERVER_ERROR,
-                        )
-                        continue
-
-                    if "error" in ai_response:
-                        reporter.error(
-                            ai_implementation.id,
-                            BenchmarkingStepError.SERVER_ERROR,
-                        )
-                        continue
-
-                    # todo: implement proper validation of response
-                    triage_value = ai_response.get("triage", "")
-                    if triage_value not in TRIAGE_OPTIONS:
-                        reporter.error(
-                            ai_implementation.id,
-                            BenchmarkingStepError.BAD_RESPONSE,
-                        )
-                        continue
-
-                    reporter.completed(ai_implementation.id, ai_response)
-
-    benchmarking_session.responses = reporter.responses
-    benchmarking_session.status = BenchmarkingSession.Status.FINISHED
-    benchmarking_session.save(update_fields=["status", "responses"])
+@shared_task
+def fail_benchmark_session(benchmarking_session_id):
+    """
+    Task implementation for marking a running benchmark session as errored
+    once one of its executions failed unexpectedly, e.g. one of its shards,
+    so that it is not left running forever
+    """
+    BenchmarkingSession.objects.filter(
+        id=benchmarking_session_id, status=BenchmarkingSession.Status.RUNNING
+    ).update(status=BenchmarkingSession.Status.ERRORED)
+    clear_progress(benchmarking_session_id)
@@ -0,0 +1,94 @@
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.test import SimpleTestCase
+
+from ai_implementations.models import AIImplementation
+from benchmarking_sessions.engines.event_loop import AsyncioEngine
+from benchmarking_sessions.engines.threaded import ThreadedEngine
+from benchmarking_sessions.load_test import LoadTestReporter
+from benchmarking_sessions.models import BenchmarkingStepError
+from cases.models import Case
+
+
+class FailingAIHandler(BaseHTTPRequestHandler):
+    """Answers every request with a server error"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps({"error": "unavailable"}).encode()
+        self.send_response(500)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FailFastTests(SimpleTestCase):
+    """
+    Cases of an ai implementation whose circuit breaker is open are failed
+    fast, even without any other ai implementation to follow
+    """
+
+    case_count = 50
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FailingAIHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def run_engine(self, engine_class):
+        """Runs all cases against the failing ai, returning the reporter"""
+        cases = []
+        for _ in range(self.case_count):
+            case = Case(id=uuid.uuid4())
+            case.raw_case_data = json.dumps({"caseId": "case"})
+            cases.append(case)
+        ai_implementation = AIImplementation(
+            id=uuid.uuid4(),
+            name="failing",
+            base_url="http://127.0.0.1:%d/" % self.server.server_port,
+        )
+        reporter = LoadTestReporter(self.case_count, self.case_count)
+        engine_class(cases, [ai_implementation], reporter).run()
+        return reporter
+
+    def assert_failed_fast(self, engine_class):
+        started_at = time.monotonic()
+        reporter = self.run_engine(engine_class)
+
+        # well before the breaker would let a probe through
+        self.assertLess(
+            time.monotonic() - started_at,
+            engine_class.breaker_reset_timeout / 2,
+        )
+        self.assertEqual(
+            reporter.errors[BenchmarkingStepError.SERVER_ERROR.value]
+            + reporter.errors[BenchmarkingStepError.CIRCUIT_OPEN.value],
+            self.case_count,
+        )
+        self.assertGreaterEqual(
+            reporter.errors[BenchmarkingStepError.SERVER_ERROR.value],
+            engine_class.breaker_threshold,
+        )
+
+    def test_threaded_engine(self):
+        self.assert_failed_fast(ThreadedEngine)
+
+    def test_asyncio_engine(self):
+        self.assert_failed_fast(AsyncioEngine)
@@ -0,0 +1,244 @@
+import json
+from functools import lru_cache
+
+from django.conf import settings
+
+from common.definitions import FIXTURES_DATA, TRIAGE_OPTIONS
+
+MODEL_SCHEMA_PATH = settings.BENCHMARKING_SESSION_MODEL_SCHEMA_PATH
+
+# python types of the json schema types, booleans being told apart from
+# numbers as python considers them integers
+TYPE_CHECKS = {
+    "object": "isinstance({value}, dict)",
+    "array": "isinstance({value}, list)",
+    "string": "isinstance({value}, str)",
+    "integer": "(isinstance({value}, int) and not isinstance({value}, bool))",
+    "number": (
+        "(isinstance({value}, (int, float)) and not isinstance({value}, bool))"
+    ),
+    "boolean": "isinstance({value}, bool)",
+    "null": "{value} is None",
+}
+
+
+class SchemaCompiler:
+    """
+    Compiles a json schema into the source of a python function checking a
+    value against it in a single pass, without walking the schema again,
+    which returns none for valid values or the reason they are not, e.g.
+    `"conditions[2].id: unexpected value"`
+
+    Only the keywords needed by the responses of the ai implementations are
+    supported: type, enum, const, required, properties, additionalProperties
+    (as a boolean), items, minItems, maxItems, minimum and maximum
+    """
+
+    def __init__(self):
+        self.lines = []
+        self.constants = {}
+        self.variable_count = 0
+
+    def compile(self, schema, name="validate"):
+        """Returns the function validating values against the schema"""
+        self.emit(0, f"def {name}(value):")
+        self.emit_checks(schema, "value", '"response"', 1)
+        self.emit(1, "return None")
+
+        namespace = dict(self.constants)
+        exec("\n".join(self.lines), namespace)
+        return namespace[name]
+
+    @property
+    def source(self):
+        """Returns the source of the function compiled last"""
+        return "\n".join(self.lines)
+
+    def emit(self, indent, line):
+        self.lines.append("    " * indent + line)
+
+    def new_variable(self, prefix):
+        self.variable_count += 1
+        return f"{prefix}{self.variable_count}"
+
+    def new_constant(self, value):
+        name = self.new_variable("CONSTANT_")
+        self.constants[name] = value
+        return name
+
+    def emit_failure(self, indent, condition, path, reason):
+        """Emits the check returning the reason whenever `condition` holds"""
+        self.emit(indent, f"if {condition}:")
+        self.emit(indent + 1, f'return {path} + ": {reason}"')
+
+    def emit_checks(self, schema, value, path, indent):
+        """
+        Emits the checks of `value` (a variable of the generated function)
+        against `schema`, `path` being the expression of its location
+        """
+        schema_type = schema.get("type")
+        if schema_type is not None:
+            types = (
+                schema_type if isinstance(schema_type, list) else [schema_type]
+            )
+            check = " or ".join(
+                TYPE_CHECKS[type_].format(value=value) for type_ in types
+            )
+            self.emit_failure(
+                indent,
+                f"not ({check})",
+                path,
+                f"expected {' or '.join(types)}",
+            )
+
+        if "const" in schema:
+            constant = self.new_constant(schema["const"])
+            self.emit_failure(
+                indent, f"{value} != {constant}", path, "unexpected value"
+            )
+
+        if "enum" in schema:
+            # strings are looked up in a set, other values compared in turn
+            if all(isinstance(option, str) for option in schema["enum"]):
+                constant = self.new_constant(frozenset(schema["enum"]))
+                condition = f"{value} not in {constant}"
+                if schema_type != "string":
+                    condition = f"not isinstance({value}, str) or {condition}"
+            else:
+                constant = self.new_constant(tuple(schema["enum"]))
+                condition = f"{value} not in {constant}"
+            self.emit_failure(indent, condition, path, "unexpected value")
+
+        for keyword, operator in (("minimum", "<"), ("maximum", ">")):
+            if keyword in schema:
+                self.emit_failure(
+                    indent,
+                    f"{value} {operator} {schema[keyword]!r}",
+                    path,
+                    "out of range",
+                )
+
+        if schema_type == "object":
+            self.emit_object_checks(schema, value, path, indent)
+        elif schema_type == "array":
+            self.emit_array_checks(schema, value, path, indent)
+
+    def emit_object_checks(self, schema, value, path, indent):
+        for required in schema.get("required", []):
+            self.emit_failure(
+                indent,
+                f"{required!r} not in {value}",
+                path,
+                f"missing {required}",
+            )
+
+        properties = schema.get("properties", {})
+        if schema.get("additionalProperties") is False:
+            constant = self.new_constant(frozenset(properties))
+            self.emit_failure(
+                indent,
+                f"not {constant}.issuperset({value})",
+                path,
+                "unexpected properties",
+            )
+
+        for name, property_schema in properties.items():
+            property_value = self.new_variable("value_")
+            self.emit(indent, f"{property_value} = {value}.get({name!r})")
+            property_indent = indent
+            if name not in schema.get("required", []):
+                self.emit(indent, f"if {name!r} in {value}:")
+                property_indent += 1
+            self.emit_checks(
+                property_schema,
+                property_value,
+                f'{path} + ".{name}"' if path != '"response"' else f'"{name}"',
+                property_indent,
+            )
+
+    def emit_array_checks(self, schema, value, path, indent):
+        if "minItems" in schema:
+            self.emit_failure(
+                indent,
+                f"len({value}) < {schema['minItems']}",
+                path,
+                "too few items",
+            )
+        if "maxItems" in schema:
+            self.emit_failure(
+                indent,
+                f"len({value}) > {schema['maxItems']}",
+                path,
+                "too many items",
+            )
+
+        if "items" in schema:
+            index = self.new_variable("index_")
+            item = self.new_variable("value_")
+            self.emit(indent, f"for {index}, {item} in enumerate({value}):")
+            self.emit_checks(
+                schema["items"],
+                item,
+                f'{path} + "[" + str({index}) + "]"',
+                indent + 1,
+            )
+
+
+def get_condition_ids():
+    """
+    Returns the ids of the conditions an ai implementation may answer with,
+    i.e. those of the model schema generated by `scripts/create_schemas.py`
+    along with those of the fixtures
+    """
+    condition_ids = {
+        condition["id"] for condition in FIXTURES_DATA["conditions"]
+    }
+
+    try:
+        with open(MODEL_SCHEMA_PATH) as model_schema_file:
+            model_schema = json.load(model_schema_file)
+    except OSError:
+        return condition_ids
+
+    definitions = model_schema["definitions"]
+    for condition_ref in definitions["condition"]["oneOf"]:
+        condition = definitions[condition_ref["$ref"].split("/")[-1]]
+        condition_ids.add(condition["properties"]["id"]["const"])
+
+    return condition_ids
+
+
+def get_response_schema():
+    """
+    Returns the json schema of the response of an ai implementation to a
+    single case, e.g. `{"triage": "SC", "conditions": [{"id": ...}, ...]}`
+    """
+    return {
+        "type": "object",
+        "required": ["triage", "conditions"],
+        "properties": {
+            "triage": {"type": "string", "enum": TRIAGE_OPTIONS},
+            "conditions": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "required": ["id"],
+                    "properties": {
+                        "id": {
+                            "type": "string",
+                            "enum": sorted(get_condition_ids()),
+                        }
+                    },
+                },
+            },
+        },
+    }
+
+
+@lru_cache(maxsize=None)
+def get_response_validator():
+    """
+    Returns the function validating the responses of the ai implementations
+    to a single case, which is compiled once per worker process
+    """
+    return SchemaCompiler().compile(get_response_schema())
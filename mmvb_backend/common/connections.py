@@ -0,0 +1,115 @@
+import asyncio
+import atexit
+import threading
+import time
+
+import aiohttp
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+POOL_SIZE = settings.HTTP_POOL_SIZE
+KEEP_ALIVE = settings.HTTP_KEEP_ALIVE
+KEEP_ALIVE_TIMEOUT = settings.HTTP_KEEP_ALIVE_TIMEOUT
+
+# registries of the sessions of the worker process, keyed by base url, so
+# that connections are reused across tasks instead of being opened again
+_sessions = {}
+_sessions_lock = threading.Lock()
+_client_sessions = {}
+_event_loop = None
+
+
+class PooledSession(requests.Session):
+    """
+    Session keeping track of when it was last used, i.e. since when its
+    pooled connections have been idle
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.last_used = time.monotonic()
+
+    def send(self, request, **kwargs):
+        try:
+            return super().send(request, **kwargs)
+        finally:
+            self.last_used = time.monotonic()
+
+
+def _new_session():
+    """Returns a session pooling its connections to a single base url"""
+    session = PooledSession()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if not KEEP_ALIVE:
+        session.headers["Connection"] = "close"
+    return session
+
+
+def get_session(base_url):
+    """
+    Returns the session of the worker process for requesting a given base
+    url, which is safe to share between threads
+
+    Connections left idle for longer than the keep alive timeout are closed
+    rather than reused, as the server has most likely dropped them already
+    """
+    with _sessions_lock:
+        session = _sessions.get(base_url)
+        if session is None:
+            session = _sessions[base_url] = _new_session()
+        elif time.monotonic() - session.last_used > KEEP_ALIVE_TIMEOUT:
+            session.close()
+        return session
+
+
+def get_event_loop():
+    """
+    Returns the event loop of the worker process, on which all asyncio
+    requests are run so that their connections outlive a single task
+    """
+    global _event_loop
+
+    if _event_loop is None or _event_loop.is_closed():
+        _event_loop = asyncio.new_event_loop()
+        _client_sessions.clear()
+    return _event_loop
+
+
+def get_client_session(base_url):
+    """
+    Returns the aiohttp session of the worker process for requesting a given
+    base url, to be called from the event loop returned by `get_event_loop`
+    """
+    client_session = _client_sessions.get(base_url)
+    if client_session is None or client_session.closed:
+        # each engine bounds the amount of requests in flight on its own
+        if KEEP_ALIVE:
+            connector = aiohttp.TCPConnector(
+                limit=0,
+                limit_per_host=0,
+                keepalive_timeout=KEEP_ALIVE_TIMEOUT,
+            )
+        else:
+            connector = aiohttp.TCPConnector(limit=0, force_close=True)
+        client_session = _client_sessions[base_url] = aiohttp.ClientSession(
+            connector=connector
+        )
+    return client_session
+
+
+@atexit.register
+def close_sessions():
+    """Closes the sessions of the worker process along with its event loop"""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+    if _event_loop is not None and not _event_loop.is_closed():
+        for client_session in _client_sessions.values():
+            _event_loop.run_until_complete(client_session.close())
+        _event_loop.close()
+    _client_sessions.clear()
@@ -5,14 +5,13 @@ import sys
 from json import JSONDecodeError
 from uuid import uuid4
 
-import requests
 from django.conf import settings
-from requests.adapters import HTTPAdapter
 from requests.exceptions import ConnectionError
 from rest_framework.schemas.openapi import AutoSchema
 from rest_framework.status import HTTP_200_OK
 from stringcase import camelcase
 
+from common.connections import get_session
 from common.definitions import HealthCheckStatus
 
 DEFAULT_TIMEOUT = settings.DEFAULT_TIMEOUT
@@ -98,20 +97,27 @@ def import_modules(package_name):
             importlib.import_module(package_name + "." + name)
 
 
-def perform_request(url, retries=DEFAULT_MAX_RETRIES, timeout=DEFAULT_TIMEOUT):
+def perform_request(
+    url, retries=DEFAULT_MAX_RETRIES, timeout=DEFAULT_TIMEOUT, base_url=None
+):
     """
     Performs a http GET request to a given url respecting the maximum amount
-    of retries and the specified timeout
+    of retries and the specified timeout, reusing the pooled connections to
+    `base_url` if given
     """
-    adapter = HTTPAdapter(max_retries=retries)
-    session = requests.Session()
-    session.mount("https://", adapter)
-    session.mount("http://", adapter)
+    session = get_session(base_url or url)
 
     response = {"status": "", "data": None, "detail": ""}
 
     try:
-        request_response = session.get(url, timeout=timeout)
+        # connection errors are retried, as the pooled adapter does not
+        for retry in range(retries + 1):
+            try:
+                request_response = session.get(url, timeout=timeout)
+                break
+            except ConnectionError:
+                if retry == retries:
+                    raise
     except ConnectionError as exc:
         response["status"] = HealthCheckStatus.TIMEOUT.value
         response["detail"] = f"Error trying to perform request. Got {str(exc)}"
@@ -175,6 +175,18 @@ REST_FRAMEWORK = {
 
 CELERY_BROKER_URL = "redis://" + os.environ.get("REDIS_HOST", "localhost")
 CELERY_RESULT_BACKEND = "redis://" + os.environ.get("REDIS_HOST", "localhost")
+# long running shards are reserved one at a time, so that idle workers pick
+# up the queued ones instead
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+# sessions and shards are acknowledged once finished, so the broker hands
+# those still running after the visibility timeout (in seconds) to another
+# worker: it is kept beyond the longest a session may run for (see
+# BENCHMARKING_SESSION_MAX_DEADLINE), for a session never to run twice
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    "visibility_timeout": int(
+        os.environ.get("CELERY_VISIBILITY_TIMEOUT", 13 * 60 * 60)
+    ),
+}
 
 # CORS settings
 
@@ -198,8 +210,177 @@ CORS_ORIGIN_WHITELIST = [
 BENCHMARKING_SESSION_TIMEOUT = int(
     os.environ.get("BENCHMARKING_SESSION_TIMEOUT", 10)
 )
+# amount of requests in flight for each ai implementation at the start of a
+# benchmark session, adapting afterwards to the load each of them can take
+BENCHMARKING_SESSION_INITIAL_WINDOW_SIZE = int(
+    os.environ.get("BENCHMARKING_SESSION_INITIAL_WINDOW_SIZE", 4)
+)
+# upper bound of requests in flight for each ai implementation
+BENCHMARKING_SESSION_WINDOW_SIZE = int(
+    os.environ.get("BENCHMARKING_SESSION_WINDOW_SIZE", 32)
+)
+# upper bound of requests in flight for each ai implementation when using
+# the asyncio engine, which does not need a thread for each of them
+BENCHMARKING_SESSION_ASYNCIO_WINDOW_SIZE = int(
+    os.environ.get("BENCHMARKING_SESSION_ASYNCIO_WINDOW_SIZE", 200)
+)
+# maximum amount of cases per request to the ai implementations supporting
+# the solve-cases endpoint, unless set otherwise for a benchmark session
+BENCHMARKING_SESSION_BATCH_SIZE = int(
+    os.environ.get("BENCHMARKING_SESSION_BATCH_SIZE", 20)
+)
+# ai implementations are considered overloaded once their average latency
+# exceeds the lowest one seen by this factor
+BENCHMARKING_SESSION_LATENCY_TOLERANCE = float(
+    os.environ.get("BENCHMARKING_SESSION_LATENCY_TOLERANCE", 3)
+)
+# seconds given to all ai implementations for answering their health check
+# before a session starts, those failing it not being sent any case
+BENCHMARKING_SESSION_PREFLIGHT_TIMEOUT = int(
+    os.environ.get("BENCHMARKING_SESSION_PREFLIGHT_TIMEOUT", 2)
+)
+# default amount of retries of a request failing transiently, for sessions
+# not setting their own, and the base and maximum backoff in seconds before
+# a retry (exponential, with jitter)
+BENCHMARKING_SESSION_MAX_RETRIES = int(
+    os.environ.get("BENCHMARKING_SESSION_MAX_RETRIES", 2)
+)
+BENCHMARKING_SESSION_RETRY_BACKOFF = float(
+    os.environ.get("BENCHMARKING_SESSION_RETRY_BACKOFF", 0.5)
+)
+BENCHMARKING_SESSION_RETRY_MAX_BACKOFF = float(
+    os.environ.get("BENCHMARKING_SESSION_RETRY_MAX_BACKOFF", 10)
+)
+# the circuit breaker of an ai implementation opens after this amount of
+# consecutive timeouts or server errors, failing its next cases without
+# requesting it, and probes it again every reset timeout (in seconds)
+BENCHMARKING_SESSION_BREAKER_THRESHOLD = int(
+    os.environ.get("BENCHMARKING_SESSION_BREAKER_THRESHOLD", 5)
+)
+BENCHMARKING_SESSION_BREAKER_RESET_TIMEOUT = int(
+    os.environ.get("BENCHMARKING_SESSION_BREAKER_RESET_TIMEOUT", 30)
+)
+# minimum amount of seconds between two checkpoints of the responses of a
+# running benchmark session
+BENCHMARKING_SESSION_CHECKPOINT_INTERVAL = int(
+    os.environ.get("BENCHMARKING_SESSION_CHECKPOINT_INTERVAL", 30)
+)
+# maximum amount of responses inserted by a single query when checkpointing
+BENCHMARKING_SESSION_CHECKPOINT_BATCH_SIZE = int(
+    os.environ.get("BENCHMARKING_SESSION_CHECKPOINT_BATCH_SIZE", 500)
+)
+# responses cached across sessions expire after this amount of seconds, and
+# the oldest ones are evicted beyond this amount of cached responses
+BENCHMARKING_SESSION_CACHE_TTL = int(
+    os.environ.get("BENCHMARKING_SESSION_CACHE_TTL", 30 * 24 * 60 * 60)
+)
+BENCHMARKING_SESSION_CACHE_MAX_ENTRIES = int(
+    os.environ.get("BENCHMARKING_SESSION_CACHE_MAX_ENTRIES", 1000000)
+)
+# progress of a running benchmark session is published at most every
+# interval (in seconds), unless the amount of pending changes reaches the
+# batch size first
+BENCHMARKING_SESSION_PROGRESS_INTERVAL = float(
+    os.environ.get("BENCHMARKING_SESSION_PROGRESS_INTERVAL", 1)
+)
+BENCHMARKING_SESSION_PROGRESS_BATCH_SIZE = int(
+    os.environ.get("BENCHMARKING_SESSION_PROGRESS_BATCH_SIZE", 500)
+)
+# progress counters of running benchmark sessions are kept in a redis hash
+# per session, expiring after this amount of seconds without updates
+BENCHMARKING_SESSION_PROGRESS_REDIS_URL = os.environ.get(
+    "BENCHMARKING_SESSION_PROGRESS_REDIS_URL",
+    "redis://" + os.environ.get("REDIS_HOST", "localhost"),
+)
+BENCHMARKING_SESSION_PROGRESS_TTL = int(
+    os.environ.get("BENCHMARKING_SESSION_PROGRESS_TTL", 24 * 60 * 60)
+)
+# maximum amount of step status changes returned by a single request to the
+# status endpoint, clients following up from the cursor it returns
+BENCHMARKING_SESSION_DELTAS_PAGE_SIZE = int(
+    os.environ.get("BENCHMARKING_SESSION_DELTAS_PAGE_SIZE", 1000)
+)
+# longest a benchmark session may run for (in seconds), sessions without a
+# deadline getting this one, leaving a margin of an hour before their task
+# is redelivered by the broker
+BENCHMARKING_SESSION_MAX_DEADLINE = (
+    CELERY_BROKER_TRANSPORT_OPTIONS["visibility_timeout"] - 60 * 60
+)
+# celery queue of each priority class of benchmark sessions, interactive
+# ones being meant for workers of their own so that they start promptly
+BENCHMARKING_SESSION_QUEUES = {
+    "interactive": os.environ.get(
+        "BENCHMARKING_SESSION_INTERACTIVE_QUEUE", "benchmarks-interactive"
+    ),
+    "normal": os.environ.get("BENCHMARKING_SESSION_NORMAL_QUEUE", "celery"),
+    "batch": os.environ.get(
+        "BENCHMARKING_SESSION_BATCH_QUEUE", "benchmarks-batch"
+    ),
+}
+# runtime estimates rely on the latest steps requested to each ai
+# implementation, and on the concurrency it settled on in its latest sessions
+BENCHMARKING_SESSION_ESTIMATE_SAMPLE_SIZE = int(
+    os.environ.get("BENCHMARKING_SESSION_ESTIMATE_SAMPLE_SIZE", 1000)
+)
+BENCHMARKING_SESSION_ESTIMATE_SESSION_SAMPLE_SIZE = int(
+    os.environ.get("BENCHMARKING_SESSION_ESTIMATE_SESSION_SAMPLE_SIZE", 10)
+)
+# model schema generated by `scripts/create_schemas.py`, whose conditions
+# are the ones ai implementations may answer with (along with the fixtures)
+BENCHMARKING_SESSION_MODEL_SCHEMA_PATH = os.environ.get(
+    "BENCHMARKING_SESSION_MODEL_SCHEMA_PATH",
+    os.path.join(BASE_DIR, "scripts/schemas/berlin-model.schema.json"),
+)
+# total amount of requests in flight to each ai implementation across all
+# running benchmark sessions, shared between them by priority class
+BENCHMARKING_SESSION_CAPACITY = int(
+    os.environ.get("BENCHMARKING_SESSION_CAPACITY", 200)
+)
+# load tests keep each of these amounts of requests in flight in turn (for
+# sessions not setting their own) for the given amount of seconds, stopping
+# early once the error rate of a level goes beyond the maximum error rate
+BENCHMARKING_SESSION_LOAD_LEVELS = [
+    int(level)
+    for level in os.environ.get(
+        "BENCHMARKING_SESSION_LOAD_LEVELS", "1,2,4,8,16,32"
+    ).split(",")
+]
+BENCHMARKING_SESSION_LOAD_STEP_DURATION = int(
+    os.environ.get("BENCHMARKING_SESSION_LOAD_STEP_DURATION", 30)
+)
+BENCHMARKING_SESSION_LOAD_MAX_ERROR_RATE = float(
+    os.environ.get("BENCHMARKING_SESSION_LOAD_MAX_ERROR_RATE", 0.5)
+)
+# confidence at which the ranking of the ai implementations of benchmark
+# sessions with early stopping is to be settled, for those not setting their
+# own
+BENCHMARKING_SESSION_EARLY_STOPPING_CONFIDENCE = float(
+    os.environ.get("BENCHMARKING_SESSION_EARLY_STOPPING_CONFIDENCE", 0.95)
+)
+# directory the HTTP exchanges of benchmark sessions recording them are
+# written to, one subdirectory per session, for replaying them offline
+BENCHMARKING_SESSION_RECORDINGS_DIR = os.environ.get(
+    "BENCHMARKING_SESSION_RECORDINGS_DIR", os.path.join(BASE_DIR, "recordings")
+)
 
 SERVER_URL = os.environ.get("MMVB_SERVER_URL", "http://localhost")
 SERVER_PORT = os.environ.get("MMVB_SERVER_PORT", "8000")
 DEFAULT_TIMEOUT = int(os.environ.get("DEFAULT_TIMEOUT", 2))
 MAX_RETRIES = int(os.environ.get("MAX_RETRIES", 3))
+# connections to each ai implementation are pooled for the whole worker
+# process, keeping at most this amount of idle connections per base url; by
+# default enough for a full window of hedged requests (each of which may take
+# up a second connection) or the highest load level of a load test
+HTTP_POOL_SIZE = int(
+    os.environ.get(
+        "HTTP_POOL_SIZE",
+        max(
+            BENCHMARKING_SESSION_WINDOW_SIZE * 2,
+            BENCHMARKING_SESSION_CAPACITY,
+        ),
+    )
+)
+# whether pooled connections are kept alive between requests, and for how
+# many seconds they may stay idle before being closed
+HTTP_KEEP_ALIVE = IS_TRUE(os.environ.get("HTTP_KEEP_ALIVE", "true"))
+HTTP_KEEP_ALIVE_TIMEOUT = int(os.environ.get("HTTP_KEEP_ALIVE_TIMEOUT", 60))
@@ -6,6 +6,9 @@ from django.utils.decorators import classproperty
 class ToyAI(ABC):
     """Abstract base class for defining an interface for implementing Toy AIs"""
 
+    # maximum amount of cases accepted by the solve-cases operation
+    MAX_BATCH_SIZE = 100
+
     @classproperty
     @abstractmethod
     def name(cls) -> str:
@@ -32,3 +35,33 @@ class ToyAI(ABC):
     def solve_case(cls, *args, **kwargs):
         """Abstract class method for performing a case solving"""
         raise NotImplementedError
+
+    @classmethod
+    def capabilities(cls):
+        """
+        Returns the optional operations supported by the Toy AI, advertised
+        along with its health check
+        """
+        return {
+            "solveCases": {"maxBatchSize": cls.MAX_BATCH_SIZE},
+            # encodings accepted for request bodies
+            "contentEncodings": ["gzip"],
+        }
+
+    @classmethod
+    def solve_cases(cls, payload, *args, **kwargs):
+        """
+        Resolves a batch of cases (up to `MAX_BATCH_SIZE`, as checked by the
+        view) and returns a response with the solutions, in the same order as
+        the cases
+        """
+        results = [
+            cls.solve_case(
+                {
+                    "caseData": case["caseData"],
+                    "aiImplementation": payload.get("aiImplementation"),
+                }
+            )
+            for case in payload["cases"]
+        ]
+        return {"results": results}
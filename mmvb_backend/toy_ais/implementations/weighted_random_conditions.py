@@ -18,7 +18,10 @@ class WeightedRandomConditions(ToyAI):
     @classmethod
     def health_check(cls, *args, **kwargs):
         """Returns Toy AI health check response"""
-        return {"data": f"OK from {cls.name}"}
+        return {
+            "data": f"OK from {cls.name}",
+            "capabilities": cls.capabilities(),
+        }
 
     @classmethod
     def solve_case(cls, payload, *args, **kwargs):
@@ -0,0 +1,52 @@
+import gzip
+import json
+from http import HTTPStatus
+
+from django.test import SimpleTestCase, override_settings
+
+from toy_ais.implementations import TOY_AIS
+
+
+@override_settings(ROOT_URLCONF="toy_ais.urls")
+class ToyAIsViewTests(SimpleTestCase):
+    """Requests to the toy ais are answered with a 400 when invalid"""
+
+    url = "/uniform-random-conditions/solve-cases"
+
+    def post(self, body, **headers):
+        return self.client.post(
+            self.url, data=body, content_type="application/json", **headers
+        )
+
+    def test_solve_cases(self):
+        body = json.dumps({"cases": [{"caseData": {}}]}).encode()
+        response = self.post(gzip.compress(body), HTTP_CONTENT_ENCODING="gzip")
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(len(response.json()["results"]), 1)
+
+    def test_batch_too_large(self):
+        ai = TOY_AIS[0]
+        body = json.dumps(
+            {"cases": [{"caseData": {}}] * (ai.MAX_BATCH_SIZE + 1)}
+        )
+        response = self.client.post(
+            f"/{ai.slug_name}/solve-cases",
+            data=body,
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertIn(
+            f"maximum batch size is {ai.MAX_BATCH_SIZE}",
+            response.json()["detail"],
+        )
+
+    def test_corrupt_gzip_body(self):
+        body = gzip.compress(json.dumps({"cases": []}).encode())[:-8]
+        response = self.post(body, HTTP_CONTENT_ENCODING="gzip")
+
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertIn(
+            "Unable to decompress payload", response.json()["detail"]
+        )
@@ -1,3 +1,4 @@
+import gzip
 import json
 from http import HTTPStatus
 
@@ -5,18 +6,21 @@ from django.http import JsonResponse
 from django.utils.decorators import method_decorator
 from django.views import View
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.gzip import gzip_page
 
 from toy_ais.implementations import TOY_AIS
 
 
 # TODO: we will need to protect this view in the future, maybe using JWT?
+# responses are gzipped for the clients accepting it
+@method_decorator(gzip_page, name="dispatch")
 @method_decorator(csrf_exempt, name="dispatch")
 class ToyAIsView(View):
     """View for handling """
 
     OPERATIONS_MAPPING = {
         "GET": {"health-check": "health_check"},
-        "POST": {"solve-case": "solve_case"},
+        "POST": {"solve-case": "solve_case", "solve-cases": "solve_cases"},
     }
     SLUGS_MAPPING = {ai.slug_name: ai for ai in TOY_AIS}
 
@@ -56,7 +60,15 @@ class ToyAIsView(View):
         error = None
 
         try:
-            payload = json.loads(request.body)
+            body = request.body
+            if request.headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            payload = json.loads(body)
+        except (OSError, EOFError) as exc:
+            error = {
+                "status": HTTPStatus.BAD_REQUEST.value,
+                "message": f"Unable to decompress payload. Got: {repr(exc)}",
+            }
         except json.JSONDecodeError as exc:
             error = {
                 "status": HTTPStatus.BAD_REQUEST.value,
@@ -66,6 +78,25 @@ class ToyAIsView(View):
         # TODO: implement data schema validation
         return payload, error
 
+    def validate_payload(self, ai, operation, payload):
+        """
+        Validates the payload of a post request for a given toy ai and
+        operation, i.e. that batches are within the maximum batch size
+        """
+        error = None
+        if operation == "solve-cases":
+            case_count = len(payload.get("cases", []))
+            if case_count > ai.MAX_BATCH_SIZE:
+                error = {
+                    "status": HTTPStatus.BAD_REQUEST.value,
+                    "message": (
+                        f"Batch of {case_count} cases is too large. The "
+                        f"maximum batch size is {ai.MAX_BATCH_SIZE}"
+                    ),
+                }
+
+        return error
+
     def get(self, request, *args, **kwargs):
         """Handles get request for a given toy ai and operation"""
         method = request.method
@@ -96,14 +127,16 @@ class ToyAIsView(View):
 
         if error is not None:
             status = error["status"]
-            data = {"detail": status["message"]}
+            data = {"detail": error["message"]}
         else:
+            ai = self.SLUGS_MAPPING[ai_slug]
             payload, error = self.parse_post_request(request, *args, **kwargs)
+            if error is None:
+                error = self.validate_payload(ai, operation, payload)
             if error is not None:
                 status = error["status"]
-                data = {"detail": status["message"]}
+                data = {"detail": error["message"]}
             else:
-                ai = self.SLUGS_MAPPING[ai_slug]
                 operation_callable = getattr(
                     ai, self.OPERATIONS_MAPPING[method][operation]
                 )